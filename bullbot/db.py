@@ -0,0 +1,60 @@
+"""
+Database connection profiles, selected by environment variables.
+
+DB_PROFILE=sqlite (default) tunes SQLite for one writer (run_bot) alongside
+concurrent readers (dashboard, close_positions): WAL journaling, a busy
+timeout instead of immediate 'database is locked' errors, IMMEDIATE write
+transactions and memory-mapped reads.
+
+DB_PROFILE=postgres uses persistent, health-checked PostgreSQL connections.
+"""
+import os
+
+
+def sqlite_config(env, base_dir) -> dict:
+    pragmas = {
+        'journal_mode': env.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': env.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'mmap_size': int(env.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+        'cache_size': int(env.get('SQLITE_CACHE_SIZE', '-65536')),  # negative = KiB, i.e. 64 MiB
+        'temp_store': 'MEMORY',
+    }
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': env.get('SQLITE_PATH') or base_dir / 'db.sqlite3',
+        'OPTIONS': {
+            # seconds to wait on a locked database (sqlite3 busy timeout)
+            'timeout': float(env.get('SQLITE_BUSY_TIMEOUT', '20')),
+            # take the write lock at BEGIN so writers queue on the busy timeout instead of failing mid-transaction
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': ' '.join(f'PRAGMA {name}={value};' for name, value in pragmas.items()),
+        },
+    }
+
+
+def postgres_config(env) -> dict:
+    return {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': env.get('POSTGRES_DB', 'bullbot'),
+        'USER': env.get('POSTGRES_USER', 'bullbot'),
+        'PASSWORD': env.get('POSTGRES_PASSWORD', ''),
+        'HOST': env.get('POSTGRES_HOST', 'localhost'),
+        'PORT': env.get('POSTGRES_PORT', '5432'),
+        # keep connections open between requests / poll iterations, and verify them before reuse
+        'CONN_MAX_AGE': int(env.get('DB_CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'connect_timeout': int(env.get('POSTGRES_CONNECT_TIMEOUT', '10')),
+        },
+    }
+
+
+def database_config(base_dir, env=None) -> dict:
+    """DATABASES['default'] for the profile named by DB_PROFILE."""
+    env = os.environ if env is None else env
+    profile = env.get('DB_PROFILE', 'sqlite').lower()
+    if profile in ('postgres', 'postgresql'):
+        return postgres_config(env)
+    if profile == 'sqlite':
+        return sqlite_config(env, base_dir)
+    raise ValueError(f"Unknown DB_PROFILE: {profile!r} (expected 'sqlite' or 'postgres')")
@@ -14,6 +14,8 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 
+from bullbot.db import database_config
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -82,16 +84,26 @@ WSGI_APPLICATION = 'bullbot.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Profile chosen by DB_PROFILE (sqlite with WAL tuning, or postgres); see bullbot/db.py
 DATABASES = {
+    'default': database_config(BASE_DIR),
+}
+# Cache (P/L summaries). It must be shared between processes so trades opened by run_bot
+# or closed by close_positions invalidate the dashboard's summary: the default is a file
+# cache under BASE_DIR; on several hosts use e.g. django.core.cache.backends.redis.RedisCache.
+# A per-process backend (locmem) leaves summaries stale for up to PNL_SUMMARY_TTL.
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / '.cache')),
     }
 }
 # Credentials for Truth Social ingestion
 TRUTH_CREDENTIALS = {
     'username': os.getenv('TRUTH_USERNAME'),
     'password': os.getenv('TRUTH_PASSWORD'),
+    # optional session token; skips the password login
+    'token': os.getenv('TRUTH_TOKEN'),
 }
 # OpenAI API key for NLP
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
@@ -99,11 +111,77 @@ OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 BROKER = os.getenv('BROKER', 'simulation')
 # Fully-qualified class paths for services (swapable)
 INGESTION_CLASS = os.getenv('INGESTION_CLASS', 'trading.injestion.TruthClient')
+# NLP backends: trading.injestion.NLPService (OpenAI), or offline trading.nlp_backends.LexiconNLPService /
+# trading.nlp_backends.ReplayNLPService
 NLP_SERVICE_CLASS = os.getenv('NLP_SERVICE_CLASS', 'trading.injestion.NLPService')
+# ReplayNLPService: NDJSON recordings (e.g. /exports/posts.ndjson; default: classified Post rows) and
+# simulated seconds per request
+NLP_REPLAY_PATH = os.getenv('NLP_REPLAY_PATH')
+NLP_REPLAY_LATENCY = float(os.getenv('NLP_REPLAY_LATENCY', '0.3'))
+NLP_REPLAY_JITTER = float(os.getenv('NLP_REPLAY_JITTER', '0'))
 # Poll interval in seconds for run_bot command
 POLL_INTERVAL = int(os.getenv('POLL_INTERVAL', '60'))
+# Adaptive polling (trading/scheduler.py): fastest interval after recent posts (within POLL_ACTIVE_WINDOW
+# seconds), cap while the US market is open, and growth factor / ceiling while the account is quiet
+POLL_INTERVAL_MIN = int(os.getenv('POLL_INTERVAL_MIN', '10'))
+POLL_INTERVAL_MARKET = int(os.getenv('POLL_INTERVAL_MARKET', '30'))
+POLL_INTERVAL_MAX = int(os.getenv('POLL_INTERVAL_MAX', '600'))
+POLL_BACKOFF = float(os.getenv('POLL_BACKOFF', '1.5'))
+POLL_ACTIVE_WINDOW = int(os.getenv('POLL_ACTIVE_WINDOW', '900'))
+# Pre-priced ATM CALL/PUT per sector ETF for instant orders (trading/trade_templates.py, run_bot --warm-templates):
+# refresh interval, and age in seconds after which decide_trade ignores a template and prices live
+TRADE_TEMPLATES_ENABLED = os.getenv('TRADE_TEMPLATES_ENABLED', 'False').lower() in ('true', '1', 'yes')
+TRADE_TEMPLATE_REFRESH = float(os.getenv('TRADE_TEMPLATE_REFRESH', '5'))
+TRADE_TEMPLATE_MAX_AGE = float(os.getenv('TRADE_TEMPLATE_MAX_AGE', '15'))
+# Posts fetched on the first poll of a handle with no stored since_id cursor
+TRUTH_BACKFILL = int(os.getenv('TRUTH_BACKFILL', '20'))
+# Trades priced concurrently by run_bot (1 = serial); classification is batched instead
+PIPELINE_CONCURRENCY = int(os.getenv('PIPELINE_CONCURRENCY', '1'))
+# Extra attempts per post when the model's reply is invalid or the API errors transiently, and the
+# base pause (seconds, doubled per attempt) before retrying transient errors
+NLP_MAX_RETRIES = int(os.getenv('NLP_MAX_RETRIES', '2'))
+NLP_RETRY_BACKOFF = float(os.getenv('NLP_RETRY_BACKOFF', '0.5'))
+# Max posts packed into one classification request when several arrive at once
+NLP_BATCH_SIZE = int(os.getenv('NLP_BATCH_SIZE', '10'))
+# Classification cache: reuse answers for identical post text (TTL in seconds)
+NLP_CACHE_ENABLED = os.getenv('NLP_CACHE_ENABLED', 'True').lower() in ('true', '1', 'yes')
+NLP_CACHE_TTL = int(os.getenv('NLP_CACHE_TTL', str(30 * 24 * 3600)))
+NLP_CACHE_MAX_ENTRIES = int(os.getenv('NLP_CACHE_MAX_ENTRIES', '50000'))
+# Local relevance pre-filter (trading/prefilter.py): posts scoring below the threshold skip the LLM.
+# Train the model with `manage.py train_prefilter`; without one it gates on market keywords.
+PREFILTER_ENABLED = os.getenv('PREFILTER_ENABLED', 'False').lower() in ('true', '1', 'yes')
+PREFILTER_THRESHOLD = float(os.getenv('PREFILTER_THRESHOLD', '0.2'))
+PREFILTER_MODEL_PATH = os.getenv('PREFILTER_MODEL_PATH') or BASE_DIR / 'prefilter.json'
 # Username/handle to fetch posts for
 TRUTH_HANDLE = os.getenv('TRUTH_HANDLE', 'realDonaldTrump')
+# Handles watched by INGESTION_CLASS=trading.injestion.MultiHandleTruthClient (comma-separated), polled concurrently
+TRUTH_HANDLES = [h.strip() for h in os.getenv('TRUTH_HANDLES', TRUTH_HANDLE).split(',') if h.strip()]
+TRUTH_POLL_WORKERS = int(os.getenv('TRUTH_POLL_WORKERS', '8'))
+# Request budget shared by all handles: TRUTH_RATE_LIMIT requests per TRUTH_RATE_WINDOW seconds
+TRUTH_RATE_LIMIT = int(os.getenv('TRUTH_RATE_LIMIT', '250'))
+TRUTH_RATE_WINDOW = float(os.getenv('TRUTH_RATE_WINDOW', '300'))
+# Streaming ingestion (INGESTION_CLASS=trading.injestion.StreamingTruthClient):
+# SSE endpoint, seconds get_new_posts waits for a post, socket read timeout and max reconnect backoff.
+# The user stream only carries TRUTH_HANDLE if the logged-in account follows it.
+TRUTH_STREAM_URL = os.getenv('TRUTH_STREAM_URL', 'https://truthsocial.com/api/v1/streaming/user')
+TRUTH_STREAM_WAIT = float(os.getenv('TRUTH_STREAM_WAIT', '60'))
+TRUTH_STREAM_TIMEOUT = float(os.getenv('TRUTH_STREAM_TIMEOUT', '90'))
+TRUTH_STREAM_BACKOFF_MAX = float(os.getenv('TRUTH_STREAM_BACKOFF_MAX', '60'))
+# run_bot sidecar port for Prometheus metrics at /metrics (0 = off; the web app always serves /metrics)
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))
+# Interface the sidecar binds to (0.0.0.0 to let a Prometheus server on another host scrape it)
+METRICS_ADDRESS = os.getenv('METRICS_ADDRESS', '127.0.0.1')
+# Store per-post stage timings (LatencySpan rows, see `manage.py latency_report`)
+LATENCY_TRACKING = os.getenv('LATENCY_TRACKING', 'True').lower() in ('true', '1', 'yes')
+# Seconds that underlying quotes / option chains are reused across lookups
+MARKET_DATA_TTL = float(os.getenv('MARKET_DATA_TTL', '5'))
+# Furthest listed strike (as a fraction of the underlying price) that may stand in for the ATM strike
+ATM_STRIKE_TOLERANCE = float(os.getenv('ATM_STRIKE_TOLERANCE', '0.05'))
+# Positions dashboard: rows per page and P/L summary cache lifetime (seconds)
+POSITIONS_PAGE_SIZE = int(os.getenv('POSITIONS_PAGE_SIZE', '50'))
+PNL_SUMMARY_TTL = int(os.getenv('PNL_SUMMARY_TTL', '300'))
+# Rows fetched per database round-trip by the streaming export endpoints
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
 
 
 # Password validation
@@ -0,0 +1,221 @@
+"""
+Offline strategy replay over stored Posts and PriceFeed history.
+
+Posts are streamed in time order through a pluggable decision function
+(default: decide_trade's rules). Entries and exits are priced from PriceFeed
+closes, with no network access. Option premiums are modelled as intrinsic value
+plus an at-the-money time value of 0.4 * S * sigma * sqrt(T) (Brenner &
+Subrahmanyam), and exits follow close_positions: sell once the mark reaches
+entry * (1 + profit_target), otherwise hold to expiry.
+
+Loading (DB access) and simulation (pure NumPy) are separate steps, so a
+parameter sweep can load once and simulate many times.
+"""
+import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .execution import SECTOR_TICKER, STRONG_SENTIMENTS, next_friday, trade_signal
+from .injestion import SENTIMENTS
+from .models import Post, PriceFeed, StrategyPerformance
+
+CONTRACT_SIZE = 100
+YEAR_NS = 365 * 24 * 3600 * 10**9
+
+DEFAULT_PARAMS = {
+    'profit_target': 0.1,
+    'sentiments': list(STRONG_SENTIMENTS),
+    'sector_ticker': {sector: ticker for sector, ticker in SECTOR_TICKER.items() if ticker},
+    'expiry_days': None,   # None: next Friday after the post, else calendar days after it
+    'volatility': 0.3,     # annualised, for the premium model
+    'price_source': None,  # PriceFeed.source to price from (None: any)
+    'decision': 'trading.backtest.default_decision',
+}
+
+
+def default_decision(post, params: dict) -> tuple[str, str] | None:
+    """decide_trade's rules, driven by params: returns (ticker, option_type) or None."""
+    return trade_signal(
+        post.sector, post.sentiment,
+        sentiments=params['sentiments'], sector_ticker=params['sector_ticker'],
+    )
+
+
+def build_params(*overrides: dict | None) -> dict:
+    """DEFAULT_PARAMS updated by each non-empty override in turn (e.g. Strategy.parameters, CLI).
+
+    Raises ValueError if 'sentiments' is not a list of known sentiment labels.
+    """
+    params = dict(DEFAULT_PARAMS)
+    for override in overrides:
+        params.update({k: v for k, v in (override or {}).items() if v is not None})
+    sentiments = params['sentiments']
+    # a bare string would turn trade_signal's membership test into a substring match
+    if not isinstance(sentiments, list) or not all(isinstance(s, str) and s in SENTIMENTS for s in sentiments):
+        raise ValueError(f"sentiments must be a list of {', '.join(SENTIMENTS)}; got {sentiments!r}")
+    return params
+
+
+def load_price_series(ticker: str, source: str | None = None, start=None, end=None):
+    """(timestamps as int64 ns, closes as float64) for ticker from PriceFeed, oldest first."""
+    bars = PriceFeed.objects.as_arrays(ticker, start, end, source)
+    # several sources may share a timestamp; keep the first bar at each
+    ts, first = np.unique(bars['timestamp'], return_index=True)
+    return ts, bars['close'][first]
+
+
+def load_data(tickers, start=None, end=None, source=None, chunk_size: int = 2000) -> SimpleNamespace:
+    """Stream Posts (time order) and load close series for tickers; the only DB step of a backtest."""
+    posts = Post.objects.order_by('timestamp', 'id')
+    if start:
+        posts = posts.filter(timestamp__gte=start)
+    if end:
+        posts = posts.filter(timestamp__lte=end)
+    rows = posts.values_list('id', 'tweet_id', 'timestamp', 'sector', 'sentiment', 'text')
+    post_list = [
+        SimpleNamespace(id=pk, tweet_id=tweet_id, timestamp=ts, sector=sector, sentiment=sentiment, text=text)
+        for pk, tweet_id, ts, sector, sentiment, text in rows.iterator(chunk_size=chunk_size)
+    ]
+    prices = {ticker: load_price_series(ticker, source, start) for ticker in sorted(set(tickers))}
+    return SimpleNamespace(posts=post_list, prices=prices)
+
+
+def _expiry_ns(post_time: datetime.datetime, expiry_days) -> int:
+    day = post_time.date()
+    expiry = day + datetime.timedelta(days=expiry_days) if expiry_days is not None else next_friday(day)
+    end_of_day = datetime.datetime.combine(expiry, datetime.time(23, 59, 59), tzinfo=datetime.timezone.utc)
+    return int(end_of_day.timestamp()) * 10**9
+
+
+def _option_value(spot, strike, is_call, tau_years, volatility):
+    intrinsic = np.where(is_call, spot - strike, strike - spot).clip(min=0)
+    return intrinsic + 0.4 * spot * volatility * np.sqrt(np.clip(tau_years, 0, None))
+
+
+def simulate_ticker(ts, close, entry_ns, expiry_ns, is_call, profit_target: float, volatility: float) -> pd.DataFrame:
+    """
+    Simulate every signal on one underlying at once.
+
+    All bars between each entry and its expiry are flattened into one array,
+    marked in a single vectorized pass, and the first bar reaching the profit
+    target is found per trade with np.minimum.reduceat.
+    """
+    entry_idx = np.searchsorted(ts, entry_ns, side='left')
+    last_idx = np.searchsorted(ts, expiry_ns, side='right') - 1
+    valid = (entry_idx < len(ts)) & (last_idx >= entry_idx)
+    entry_idx, last_idx = entry_idx[valid], last_idx[valid]
+    expiry_ns, is_call = expiry_ns[valid], is_call[valid]
+    if not len(entry_idx):
+        return pd.DataFrame(columns=['valid_pos', 'strike', 'entry_price', 'exit_price', 'exit_ns'])
+
+    spot0 = close[entry_idx]
+    strike = np.round(spot0)
+    premium = _option_value(spot0, strike, is_call, (expiry_ns - ts[entry_idx]) / YEAR_NS, volatility)
+
+    lengths = last_idx - entry_idx + 1
+    starts = np.cumsum(lengths) - lengths
+    owner = np.repeat(np.arange(len(lengths)), lengths)
+    bar = np.arange(lengths.sum()) - starts[owner] + entry_idx[owner]
+    marks = _option_value(close[bar], strike[owner], is_call[owner], (expiry_ns[owner] - ts[bar]) / YEAR_NS, volatility)
+
+    position = np.arange(len(bar))
+    hit = (marks >= premium[owner] * (1 + profit_target)) & (bar > entry_idx[owner])
+    first_hit = np.minimum.reduceat(np.where(hit, position, len(bar)), starts)
+    held = first_hit >= len(bar)
+    exit_pos = np.where(held, starts + lengths - 1, first_hit)
+    # positions held to expiry settle at intrinsic value on the last bar
+    settle = _option_value(close[bar[exit_pos]], strike, is_call, 0, volatility)
+    return pd.DataFrame({
+        'valid_pos': np.flatnonzero(valid),
+        'strike': strike,
+        'entry_price': premium,
+        'exit_price': np.where(held, settle, marks[exit_pos]),
+        'exit_ns': ts[bar[exit_pos]],
+    })
+
+
+def run_backtest(data: SimpleNamespace, params: dict, initial_capital: float = 0.0) -> dict:
+    """Replay data.posts under params; returns {'trades': DataFrame, 'metrics': dict}. No DB access."""
+    decision = import_string(params['decision']) if isinstance(params['decision'], str) else params['decision']
+    signals = []
+    for post in data.posts:
+        signal = decision(post, params)
+        if signal and signal[0] in data.prices:
+            signals.append((post.id, post.timestamp, signal[0], signal[1] == 'CALL'))
+    frames = []
+    for ticker, group in pd.DataFrame(signals, columns=['post_id', 'timestamp', 'ticker', 'is_call']).groupby('ticker'):
+        ts, close = data.prices[ticker]
+        entry_ns = pd.to_datetime(group['timestamp'], utc=True).to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        expiry_ns = np.array([_expiry_ns(t, params['expiry_days']) for t in group['timestamp']], dtype=np.int64)
+        sim = simulate_ticker(ts, close, entry_ns, expiry_ns, group['is_call'].to_numpy(bool),
+                              float(params['profit_target']), float(params['volatility']))
+        picked = group.iloc[sim['valid_pos'].to_numpy(dtype=int)].reset_index(drop=True)
+        frames.append(pd.concat([picked, sim.drop(columns='valid_pos').reset_index(drop=True)], axis=1))
+    trades = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+        columns=['post_id', 'timestamp', 'ticker', 'is_call', 'strike', 'entry_price', 'exit_price', 'exit_ns'])
+    return {'trades': trades, 'metrics': compute_metrics(trades, initial_capital)}
+
+
+def compute_metrics(trades: pd.DataFrame, initial_capital: float = 0.0) -> dict:
+    """Aggregate P/L statistics over closed backtest trades, ordered by exit time."""
+    if trades.empty:
+        return {'num_trades': 0, 'net_profit': 0.0, 'net_profit_pct': 0.0, 'drawdown_pct': 0.0,
+                'win_rate': 0.0, 'sharpe_ratio': None, 'sortino_ratio': None, 'avg_return_pct': 0.0}
+    trades = trades.sort_values('exit_ns')
+    cost = trades['entry_price'].to_numpy(float) * CONTRACT_SIZE
+    pnl = (trades['exit_price'].to_numpy(float) - trades['entry_price'].to_numpy(float)) * CONTRACT_SIZE
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.where(cost > 0, pnl / cost, 0.0)
+    capital = initial_capital or cost.sum()
+    equity = capital + np.cumsum(pnl)
+    peak = np.maximum.accumulate(np.concatenate([[capital], equity]))[1:]
+    drawdown = ((peak - equity) / peak).max() if capital > 0 else 0.0
+    std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+    downside = returns[returns < 0]
+    downside_std = np.sqrt((downside ** 2).mean()) if len(downside) else 0.0
+    return {
+        'num_trades': int(len(trades)),
+        'net_profit': float(pnl.sum()),
+        'net_profit_pct': float(pnl.sum() / capital * 100) if capital > 0 else 0.0,
+        'drawdown_pct': float(drawdown * 100),
+        'win_rate': float((pnl > 0).mean() * 100),
+        # per-trade ratios (not annualised)
+        'sharpe_ratio': float(returns.mean() / std) if std > 0 else None,
+        'sortino_ratio': float(returns.mean() / downside_std) if downside_std > 0 else None,
+        'avg_return_pct': float(returns.mean() * 100),
+    }
+
+
+def _decimal(value, max_digits: int, places: int) -> Decimal | None:
+    """Quantize to a DecimalField's places, clamped to what max_digits can hold."""
+    if value is None:
+        return None
+    limit = 10 ** (max_digits - places) - 10 ** -places
+    return Decimal(str(max(-limit, min(limit, value)))).quantize(Decimal(1).scaleb(-places))
+
+
+def save_performance(strategy, result: dict, params: dict, start=None, end=None, extra: dict | None = None):
+    """Write backtest metrics to a StrategyPerformance row; the full metrics and params go in other_metrics."""
+    metrics, trades = result['metrics'], result['trades']
+    if start is None:
+        start = pd.Timestamp(trades['timestamp'].min()).to_pydatetime() if not trades.empty else timezone.now()
+    if end is None and not trades.empty:
+        end = pd.Timestamp(int(trades['exit_ns'].max()), tz='UTC').to_pydatetime()
+    return StrategyPerformance.objects.create(
+        strategy=strategy,
+        start_time=start,
+        end_time=end,
+        net_profit=_decimal(metrics['net_profit'], 20, 8),
+        net_profit_pct=_decimal(metrics['net_profit_pct'], 7, 4),
+        drawdown_pct=_decimal(metrics['drawdown_pct'], 7, 4),
+        sharpe_ratio=_decimal(metrics['sharpe_ratio'], 7, 4),
+        sortino_ratio=_decimal(metrics['sortino_ratio'], 7, 4),
+        num_trades=metrics['num_trades'],
+        win_rate=_decimal(metrics['win_rate'], 5, 2),
+        other_metrics={'backtest': True, 'params': params, 'metrics': metrics, **(extra or {})},
+    )
@@ -0,0 +1,243 @@
+"""
+Offline micro-benchmarks for the pipeline hot paths (run via `manage.py bench`).
+
+Truthbrush, OpenAI and yfinance are replaced by in-process fakes, and every
+benchmark runs inside a transaction that is rolled back, so nothing touches the
+network or leaves rows behind. The bench command runs the suite in a throwaway
+test database, so existing rows neither skew timings nor get locked.
+"""
+import datetime
+import statistics
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.test import RequestFactory
+from django.utils import timezone
+
+from . import market_data, trade_templates
+from .execution import SECTOR_TICKER, Simulator, decide_trade, next_friday, price_trade
+from .injestion import NLPService, TruthClient
+from .models import IngestionCursor, OptionTrade, Post
+from .positions import invalidate_pnl_summary
+from .views import positions_list
+
+UNDERLYING = 100.4
+
+
+class FakeTruthSession:
+    """Stands in for TruthSession: pull_statuses yields pre-built Mastodon-style dicts, newest first."""
+    def __init__(self, statuses):
+        self.statuses = statuses
+
+    def pull_statuses(self, username, since_id=None, **kwargs):
+        return iter(self.statuses)
+
+
+def fake_statuses(n: int, handle: str = 'bench') -> list[dict]:
+    start = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+    return [
+        {
+            'id': str(10**17 + i),
+            'content': f'<p>Post number {i}: tariffs, oil and chips are going way up!</p>',
+            'created_at': (start + datetime.timedelta(minutes=i)).isoformat().replace('+00:00', 'Z'),
+            'account': {'acct': handle},
+        }
+        for i in reversed(range(n))
+    ]
+
+
+class FakeTicker:
+    """Stands in for yfinance.Ticker: a one-bar history and a 50-150 strike chain."""
+    def __init__(self, ticker):
+        self.ticker = ticker
+
+    def history(self, period='1d'):
+        return pd.DataFrame({'Close': [UNDERLYING]}, index=pd.DatetimeIndex([pd.Timestamp('2025-01-02', tz='UTC')]))
+
+    def option_chain(self, expiry):
+        strikes = np.arange(50.0, 151.0)
+        calls = pd.DataFrame({
+            'strike': strikes, 'bid': np.maximum(UNDERLYING - strikes, 0) + 0.9,
+            'ask': np.maximum(UNDERLYING - strikes, 0) + 1.1, 'lastPrice': np.maximum(UNDERLYING - strikes, 0) + 1.0,
+        })
+        puts = calls.assign(
+            bid=np.maximum(strikes - UNDERLYING, 0) + 0.9, ask=np.maximum(strikes - UNDERLYING, 0) + 1.1,
+            lastPrice=np.maximum(strikes - UNDERLYING, 0) + 1.0,
+        )
+        return SimpleNamespace(calls=calls, puts=puts)
+
+
+def fake_chat(prompt, max_tokens=8, schema=None):
+    return '{"sector": "energy", "sentiment": "strongly_bullish"}'
+
+
+@contextmanager
+def offline():
+    """Swap the network clients for fakes and start from an empty market-data cache."""
+    market_data.clear_cache()
+    with mock.patch.object(market_data.yf, 'Ticker', FakeTicker), \
+            mock.patch.object(NLPService, '_chat', staticmethod(fake_chat)):
+        yield
+    market_data.clear_cache()
+
+
+@contextmanager
+def throwaway_database(using: str = DEFAULT_DB_ALIAS):
+    """Point the connection at a freshly migrated test database, destroyed on exit (as the test runner does)."""
+    connection = connections[using]
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+@contextmanager
+def rolled_back():
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def timed(fn, items: int, repeat: int = 3, setup=None) -> dict:
+    """Best-of-`repeat` wall time of fn() (setup() runs untimed before each), normalized per item."""
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    best = min(times)
+    return {
+        'items': items, 'repeat': repeat, 'best_s': best, 'median_s': statistics.median(times),
+        'per_item_us': best / items * 1e6, 'items_per_s': items / best if best else None,
+    }
+
+
+def make_post(i: int) -> Post:
+    return Post(tweet_id=f'bench-{i}', user_handle='bench', text=f'bench post {i}', timestamp=timezone.now(),
+                sector='energy', sentiment='strongly_bullish')
+
+
+def make_trades(n: int, open_only: bool = True) -> list[OptionTrade]:
+    """Bulk-insert n posts with one trade each, spread over the sector ETFs and two expiries."""
+    posts = Post.objects.bulk_create([make_post(i) for i in range(n)], batch_size=5000)
+    tickers = [t for t in SECTOR_TICKER.values() if t]
+    expiries = [next_friday(datetime.date.today()), next_friday(datetime.date.today()) + datetime.timedelta(days=7)]
+    trades = []
+    for i, post in enumerate(posts):
+        closed = not open_only and i % 2
+        trades.append(OptionTrade(
+            post=post, ticker=tickers[i % len(tickers)], option_type='CALL' if i % 3 else 'PUT',
+            strike=Decimal(90 + i % 20), expiry=expiries[i % 2], entry_price=Decimal('1.00'),
+            exit_price=Decimal('1.25') if closed else None, exit_timestamp=timezone.now() if closed else None,
+        ))
+    return OptionTrade.objects.bulk_create(trades, batch_size=5000)
+
+
+def bench_ingest_parse(posts: int = 500, repeat: int = 5) -> dict:
+    """TruthClient.get_new_posts: parse a page of statuses into post records."""
+    client = TruthClient(handle='bench', session=FakeTruthSession(fake_statuses(posts)))
+    with rolled_back():
+        # a checkpoint older than every fetched id, so the whole page counts as new
+        IngestionCursor.objects.create(handle='bench', since_id='0')
+
+        def run():
+            assert len(client.get_new_posts()) == posts
+        return timed(run, posts, repeat)
+
+
+def bench_sector_and_sentiment(calls: int = 2000, repeat: int = 5) -> dict:
+    """NLPService._sector_and_sentiment: prompt, structured-output parse and validation (fake completion)."""
+    def run():
+        for i in range(calls):
+            NLPService._sector_and_sentiment(f'Drill baby drill {i}')
+    return timed(run, calls, repeat)
+
+
+def bench_decide_trade(calls: int = 200, repeat: int = 5, warm: bool = False, templated: bool = False) -> dict:
+    """decide_trade end to end: quote, strike, expiry and chain lookup (cold or warm cache), or a pre-priced template."""
+    warmer = None
+    if templated:
+        warmer = trade_templates.TemplateWarmer(price_trade, [t for t in SECTOR_TICKER.values() if t],
+                                                max_age=float('inf'))
+        warmer.refresh()
+
+    def run():
+        for _ in range(calls):
+            if not warm:
+                market_data.clear_cache()
+            assert decide_trade('energy', 'strongly_bullish')
+    try:
+        with mock.patch.object(trade_templates, '_warmer', warmer):
+            return timed(run, calls, repeat)
+    finally:
+        if warmer:
+            warmer.stop()
+
+
+def bench_create_trade(trades: int = 1000, repeat: int = 3) -> dict:
+    """Simulator.create_trade insert rate."""
+    info = {'ticker': 'XLE', 'option_type': 'CALL', 'strike': Decimal('100'),
+            'expiry': next_friday(datetime.date.today()), 'entry_price': Decimal('1.10')}
+    with rolled_back():
+        post = make_post(0)
+        post.save()
+
+        def run():
+            for _ in range(trades):
+                Simulator.create_trade(post, info=info)
+        return timed(run, trades, repeat)
+
+
+def bench_close_positions(trades: int = 1000, repeat: int = 3) -> dict:
+    """close_positions over N open trades (chain marks + vectorized P/L + bulk_update)."""
+    with rolled_back():
+        make_trades(trades)
+
+        def reopen():
+            OptionTrade.objects.update(exit_price=None, exit_timestamp=None)
+            market_data.clear_cache()
+        return timed(lambda: call_command('close_positions', stdout=StringIO()), trades, repeat, setup=reopen)
+
+
+def bench_positions_list(rows: int, repeat: int = 3) -> dict:
+    """positions_list: first page plus a cold P/L summary over `rows` trades."""
+    factory = RequestFactory()
+    with rolled_back():
+        make_trades(rows, open_only=False)
+        return timed(lambda: positions_list(factory.get('/positions/')).content, rows, repeat,
+                     setup=invalidate_pnl_summary)
+
+
+def run_all(sizes: dict, log, only=None) -> dict:
+    """Run the suite (names in `only`, or all), calling log(name, result) after each; returns {name: result}."""
+    suite = {
+        'ingest_parse': lambda: bench_ingest_parse(sizes['posts']),
+        'sector_and_sentiment': lambda: bench_sector_and_sentiment(sizes['calls']),
+        'decide_trade_cold': lambda: bench_decide_trade(sizes['decisions']),
+        'decide_trade_warm': lambda: bench_decide_trade(sizes['decisions'], warm=True),
+        'decide_trade_template': lambda: bench_decide_trade(sizes['decisions'], templated=True),
+        'create_trade': lambda: bench_create_trade(sizes['trades']),
+        'close_positions': lambda: bench_close_positions(sizes['trades']),
+    }
+    for rows in sizes['rows']:
+        suite[f'positions_list_{rows}'] = lambda rows=rows: bench_positions_list(rows)
+    results = {}
+    with offline():
+        for name, bench in suite.items():
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            results[name] = bench()
+            log(name, results[name])
+    return results
@@ -0,0 +1,114 @@
+"""
+Persistent, content-addressed cache for post classifications.
+"""
+import datetime
+import hashlib
+import logging
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import F
+from django.utils import timezone
+
+from .metrics import CACHE_LOOKUPS
+from .models import ClassificationCacheEntry
+from .text import normalize_text
+
+log = logging.getLogger(__name__)
+
+
+class ClassificationCache:
+    """
+    Database-backed cache of (sector, sentiment) per normalized post text.
+
+    Keys include the model/prompt version, so changing either naturally
+    invalidates old answers. Entries expire after ``ttl`` seconds and the
+    table is trimmed to ``max_entries`` least-recently-used rows. Cache errors
+    are logged and treated as misses so classification never depends on them.
+    """
+    EVICT_EVERY = 64  # writes between eviction passes
+
+    def __init__(self, version: str, ttl: int | None = None, max_entries: int | None = None):
+        self.version = version
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.version}\x00{normalize_text(text)}".encode()).hexdigest()
+
+    def _count(self, hit: bool):
+        CACHE_LOOKUPS.inc(result='hit' if hit else 'miss')
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, text: str) -> tuple[str, str] | None:
+        key = self.key(text)
+        try:
+            entry = ClassificationCacheEntry.objects.filter(key=key).first()
+            now = timezone.now()
+            if entry and self.ttl and entry.created_at < now - datetime.timedelta(seconds=self.ttl):
+                entry.delete()
+                entry = None
+            if entry:
+                ClassificationCacheEntry.objects.filter(pk=entry.pk).update(hits=F('hits') + 1, last_used_at=now)
+        except DatabaseError as e:
+            log.warning("classification cache read failed: %s", e)
+            entry = None
+        self._count(entry is not None)
+        return (entry.sector, entry.sentiment) if entry else None
+
+    def set(self, text: str, result: tuple[str, str]):
+        sector, sentiment = result
+        try:
+            ClassificationCacheEntry.objects.update_or_create(
+                key=self.key(text),
+                defaults={'model_version': self.version, 'sector': sector, 'sentiment': sentiment},
+            )
+            with self._lock:
+                self._writes += 1
+                evict = self._writes % self.EVICT_EVERY == 0
+            if evict:
+                self.evict()
+        except DatabaseError as e:
+            log.warning("classification cache write failed: %s", e)
+
+    def evict(self) -> int:
+        """Drop expired rows and trim to max_entries (least recently used first); returns rows deleted."""
+        deleted = 0
+        if self.ttl:
+            cutoff = timezone.now() - datetime.timedelta(seconds=self.ttl)
+            deleted += ClassificationCacheEntry.objects.filter(created_at__lt=cutoff).delete()[0]
+        if self.max_entries:
+            stale = ClassificationCacheEntry.objects.order_by('-last_used_at').values_list('pk', flat=True)[self.max_entries:]
+            deleted += ClassificationCacheEntry.objects.filter(pk__in=list(stale)).delete()[0]
+        return deleted
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+_caches: dict[str, ClassificationCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_classification_cache(version: str) -> ClassificationCache | None:
+    """Return the process-wide cache for a model/prompt version, or None when disabled."""
+    if not getattr(settings, 'NLP_CACHE_ENABLED', True):
+        return None
+    with _caches_lock:
+        if version not in _caches:
+            _caches[version] = ClassificationCache(
+                version,
+                ttl=getattr(settings, 'NLP_CACHE_TTL', None),
+                max_entries=getattr(settings, 'NLP_CACHE_MAX_ENTRIES', None),
+            )
+        return _caches[version]
@@ -3,8 +3,11 @@ Execution logic: price fetching, decision rules, and simulation.
 """
 import datetime
 from decimal import Decimal, ROUND_HALF_UP
-import yfinance as yf
 
+from django.conf import settings
+
+from . import latency, market_data, trade_templates
+from .metrics import TRADES_OPENED
 from .models import OptionTrade, Post
 
 # Map detected sector to representative ETF ticker
@@ -18,6 +21,11 @@ SECTOR_TICKER = {
     'none': None,
 }
 
+# Sentiments that trigger a trade
+STRONG_SENTIMENTS = ('strongly_bullish', 'strongly_bearish')
+# (sector, sentiment) stored for posts that were not classified (blank sentiment, never traded)
+UNCLASSIFIED = ('none', '')
+
 def next_friday(from_date: datetime.date) -> datetime.date:
     """Return the next Friday after the given date."""
     days_ahead = 4 - from_date.weekday()
@@ -25,25 +33,50 @@ def next_friday(from_date: datetime.date) -> datetime.date:
         days_ahead += 7
     return from_date + datetime.timedelta(days=days_ahead)
 
+def trade_signal(sector: str, sentiment: str, sentiments=STRONG_SENTIMENTS, sector_ticker=None) -> tuple[str, str] | None:
+    """
+    Map sector and sentiment to (ticker, option_type), or None if no trade.
+    Only sentiments listed in `sentiments` qualify; bullish buys a CALL, bearish a PUT.
+    """
+    sent_low = (sentiment or '').lower()
+    if sent_low not in sentiments:
+        return None
+    ticker = (SECTOR_TICKER if sector_ticker is None else sector_ticker).get(sector)
+    if not ticker:
+        return None
+    if 'bullish' in sent_low:
+        return ticker, 'CALL'
+    if 'bearish' in sent_low:
+        return ticker, 'PUT'
+    return None
+
 def decide_trade(sector: str, sentiment: str) -> dict | None:
     """
     Decide on an option trade based on sector and sentiment.
     Returns dict with keys: ticker, option_type, strike, expiry, entry_price.
     """
     # Only strong sentiments trigger trades
-    sent_low = sentiment.lower()
-    if sent_low not in ('strongly_bullish', 'strongly_bearish'):
-        return None
-    ticker = SECTOR_TICKER.get(sector)
-    if not ticker:
+    signal = trade_signal(sector, sentiment)
+    if not signal:
         return None
-    # Determine option type
-    opt_type = 'CALL' if 'bullish' in sent_low else 'PUT'
+    ticker, opt_type = signal
+    # Pre-priced by the template warmer when it runs (run_bot --warm-templates)
+    template = trade_templates.lookup(ticker, opt_type)
+    if template is not None:
+        return template
+    return price_trade(ticker, opt_type)
+
+
+def price_trade(ticker: str, opt_type: str) -> dict | None:
+    """
+    Price an ATM option on ticker expiring next Friday from live market data.
+    Returns the decide_trade dict, or None without an underlying quote.
+    """
     # ATM strike: nearest integer
     # Fetch or calculate strike price based on underlying
     # First, try underlying price for strike
-    yf_ticker = yf.Ticker(ticker)
-    hist = yf_ticker.history(period='1d')
+    with latency.span('quote_fetch'):
+        hist = market_data.get_history(ticker)
     if hist.empty:
         return None
     underlying_price = Decimal(hist['Close'].iloc[-1])
@@ -53,12 +86,16 @@ def decide_trade(sector: str, sentiment: str) -> dict | None:
     # Attempt to fetch option prices (bid/ask)
     bid, ask = None, None
     try:
-        opt_chain = yf_ticker.option_chain(expiry.strftime('%Y-%m-%d'))
-        df = opt_chain.calls if opt_type == 'CALL' else opt_chain.puts
-        match = df[df['strike'] == float(strike)]
-        if not match.empty:
-            bid = Decimal(str(match['bid'].iloc[-1]))
-            ask = Decimal(str(match['ask'].iloc[-1]))
+        # nearest listed strike, so an unlisted rounded ATM strike still gets a quote,
+        # but not one so far away on a sparse chain that it is no longer at the money
+        tolerance = float(underlying_price) * getattr(settings, 'ATM_STRIKE_TOLERANCE', 0.05)
+        with latency.span('chain_fetch'):
+            quote = market_data.get_chain_index(ticker, expiry, opt_type).nearest(float(strike), tolerance)
+        if quote:
+            if quote['strike'] != float(strike):
+                strike = Decimal(str(quote['strike']))
+            bid = Decimal(str(quote['bid'])) if quote['bid'] is not None else None
+            ask = Decimal(str(quote['ask'])) if quote['ask'] is not None else None
     except Exception:
         # option_chain may not be available, fallback
         pass
@@ -81,16 +118,20 @@ def decide_trade(sector: str, sentiment: str) -> dict | None:
 class Simulator:
     """Simulate paper trades by writing OptionTrade rows."""
     @staticmethod
-    def create_trade(post: Post) -> OptionTrade | None:
-        info = decide_trade(post.sector, post.sentiment)
+    def create_trade(post: Post, info: dict | None = None) -> OptionTrade | None:
+        # info may be priced ahead of time (e.g. by the pipeline's worker pool)
+        if info is None:
+            info = decide_trade(post.sector, post.sentiment)
         if not info:
             return None
-        trade = OptionTrade.objects.create(
-            post=post,
-            ticker=info['ticker'],
-            option_type=info['option_type'],
-            strike=info['strike'],
-            expiry=info['expiry'],
-            entry_price=info['entry_price'],
-        )
+        with latency.span('trade_write'):
+            trade = OptionTrade.objects.create(
+                post=post,
+                ticker=info['ticker'],
+                option_type=info['option_type'],
+                strike=info['strike'],
+                expiry=info['expiry'],
+                entry_price=info['entry_price'],
+            )
+        TRADES_OPENED.inc(option_type=info['option_type'])
         return trade
\ No newline at end of file
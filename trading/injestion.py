@@ -1,22 +1,147 @@
-import logging, re, json, datetime as dt
+import abc, logging, json
+import itertools, queue, random, threading, time, urllib.request
+from concurrent.futures import ThreadPoolExecutor
 import openai
 from django.conf import settings
+from django.db import connection
 from truthbrush import Api as TruthScooper
 from types import SimpleNamespace
 from dateutil import parser as date_parse
 from django.utils import timezone
 
+from . import latency
+from .classification_cache import get_classification_cache
+from .execution import UNCLASSIFIED
+from .metrics import LLM_FAILURES, LLM_REQUESTS
+from .models import IngestionCursor
+
 log = logging.getLogger(__name__)
 # OpenAI key is set per request in NLPService
 
 SECTORS = ["defense", "energy", "healthcare", "technology", "finance", "industrials", "none"]
+SENTIMENTS = ["strongly_bullish", "bullish", "neutral", "bearish", "strongly_bearish"]
+# Structured-output schemas: the enums constrain decoding, so the prompt need not list them
+LABEL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "sector": {"type": "string", "enum": SECTORS},
+        "sentiment": {"type": "string", "enum": SENTIMENTS},
+    },
+    "required": ["sector", "sentiment"],
+    "additionalProperties": False,
+}
+BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {"labels": {"type": "array", "items": LABEL_SCHEMA}},
+    "required": ["labels"],
+    "additionalProperties": False,
+}
+# API errors worth retrying after a pause; anything else fails the post immediately
+TRANSIENT_ERRORS = (openai.APIConnectionError, openai.APITimeoutError, openai.RateLimitError, openai.InternalServerError)
+
+
+class ClassificationError(ValueError):
+    """The model gave no valid (sector, sentiment), as opposed to a genuine neutral answer."""
+
+def parse_status(item, handle: str) -> SimpleNamespace:
+    """Normalize a truthbrush/Mastodon status (dict or object) to SimpleNamespace(id, text, created_at, user_handle)."""
+    # unify dict or object
+    if isinstance(item, dict):
+        raw_id = str(item.get('id'))
+        text = item.get('content') or item.get('body') or item.get('text') or ''
+        ts = item.get('created_at')
+        try:
+            if isinstance(ts, str):
+                created_at = date_parse.parse(ts)
+            else:
+                created_at = timezone.now()
+        except Exception:
+            created_at = timezone.now()
+        user_handle = (item.get('account', {}) or {}).get('acct') or handle
+    else:
+        raw_id = str(item.id)
+        text = getattr(item, 'text', '')
+        created_at = getattr(item, 'created_at', timezone.now())
+        user_handle = getattr(item, 'user_handle', handle)
+    return SimpleNamespace(id=raw_id, text=text, created_at=created_at, user_handle=user_handle)
+
+
+class RateBudget:
+    """Token bucket shared by every request to the Truth Social API: `limit` requests per `window` seconds."""
+    def __init__(self, limit: int, window: float):
+        self.capacity = max(1, limit)
+        self.rate = self.capacity / window
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class TruthSession(TruthScooper):
+    """
+    truthbrush Api safe to share between handles and threads: one login, account
+    lookups cached (pull_statuses would otherwise repeat one per poll), HTTP
+    connections reused per thread, and every request drawn from one RateBudget.
+    """
+    def __init__(self, username=None, password=None, token=None, budget=None):
+        super().__init__(username, password, token)
+        self.budget = budget or RateBudget(
+            getattr(settings, 'TRUTH_RATE_LIMIT', 250), getattr(settings, 'TRUTH_RATE_WINDOW', 300),
+        )
+        self._accounts = {}
+        self._lookup_lock = threading.Lock()
+        self._local = threading.local()
+
+    def lookup(self, user_handle: str = None) -> dict | None:
+        # serialized so the first call logs in once, not once per thread
+        with self._lookup_lock:
+            if user_handle in self._accounts:
+                return self._accounts[user_handle]
+            account = super().lookup(user_handle)
+            # only cache a real account: None or an {"error": ...} reply is retried on the next poll
+            if isinstance(account, dict) and 'id' in account:
+                self._accounts[user_handle] = account
+            return account
+
+    def _make_session(self):
+        if not hasattr(self._local, 'session'):
+            self._local.session = super()._make_session()
+        return self._local.session
+
+    def _get(self, url: str, params: dict = None):
+        self.budget.acquire()
+        return super()._get(url, params)
+
 
 class TruthClient:
-    """Fetch new posts from Truth Social via truthbrush.)"""
-    def __init__(self):
+    """Fetch new posts from Truth Social via truthbrush.)"""
+    def __init__(self, handle=None, session=None):
         creds = settings.TRUTH_CREDENTIALS
-        self.sc = TruthScooper(creds.get("username"), creds.get("password"))
+        self.sc = session or TruthSession(creds.get("username"), creds.get("password"), creds.get("token"))
+        # None follows settings.TRUTH_HANDLE
+        self.handle = handle
         self.last_seen = None
+        self._cursor = None
+
+    def cursor(self, handle: str) -> IngestionCursor:
+        """
+        Reload the persisted checkpoint for handle and set last_seen from it. The pipeline
+        checkpoints each post as it is stored, so a post that failed to store is fetched again.
+        """
+        self._cursor, _ = IngestionCursor.objects.get_or_create(handle=handle)
+        self.last_seen = self._cursor.since_id or None
+        return self._cursor
 
     def get_new_posts(self):
         """
@@ -24,79 +149,375 @@ class TruthClient:
         Returns a list of SimpleNamespace(id, text, created_at, user_handle).
         """
         # Determine handle from settings
-        handle = getattr(settings, 'TRUTH_HANDLE', 'realDonaldTrump')
-        raw_items = self.sc.pull_statuses(handle)
+        handle = self.handle or getattr(settings, 'TRUTH_HANDLE', 'realDonaldTrump')
+        self.cursor(handle)
+        return self.fetch(handle)
+
+    def fetch(self, handle: str) -> list:
+        """Statuses newer than last_seen, oldest-first. Network only; safe to call from a worker thread."""
+        with latency.collect() as spans, latency.span('ingest_fetch'):
+            # with since_id truthbrush stops paging at the first already-seen status
+            raw_items = self.sc.pull_statuses(handle, since_id=self.last_seen)
+            if not self.last_seen:
+                # no cursor yet: take the newest posts, not the account's whole history
+                raw_items = itertools.islice(raw_items, getattr(settings, 'TRUTH_BACKFILL', 20))
+            # pull_statuses is lazy: the requests happen while iterating
+            raw_items = list(raw_items)
+        fetched_at = timezone.now()
         fresh = []
         for item in raw_items:
-            # unify dict or object
-            if isinstance(item, dict):
-                raw_id = str(item.get('id'))
-                text = item.get('content') or item.get('body') or item.get('text') or ''
-                ts = item.get('created_at')
-                try:
-                    if isinstance(ts, str):
-                        created_at = date_parse.parse(ts)
-                    else:
-                        created_at = timezone.now()
-                except Exception:
-                    created_at = timezone.now()
-                user_handle = (item.get('account', {}) or {}).get('acct') or handle
-            else:
-                raw_id = str(item.id)
-                text = getattr(item, 'text', '')
-                created_at = getattr(item, 'created_at', timezone.now())
-                user_handle = getattr(item, 'user_handle', handle)
+            status = parse_status(item, handle)
             # stop if reached previously seen
-            if self.last_seen and raw_id == self.last_seen:
+            if self.last_seen and status.id == self.last_seen:
                 break
-            status = SimpleNamespace(
-                id=raw_id, text=text, created_at=created_at, user_handle=user_handle
-            )
+            # cursor the pipeline checkpoints once this post is stored
+            status.source = handle
+            status.fetched_at = fetched_at
+            status.spans = list(spans)
             fresh.append(status)
-        # update last_seen to newest
-        if fresh:
-            self.last_seen = fresh[0].id
         # return oldest-first
         return list(reversed(fresh))
 
-class NLPService:
+
+class MultiHandleTruthClient:
+    """
+    Poll several handles (settings.TRUTH_HANDLES) concurrently over one shared
+    TruthSession, each with its own persisted cursor, and merge their posts into
+    one time-ordered stream.
+    """
+    def __init__(self, handles=None, max_workers=None):
+        creds = settings.TRUTH_CREDENTIALS
+        handles = handles or getattr(settings, 'TRUTH_HANDLES', None) or [settings.TRUTH_HANDLE]
+        self.sc = TruthSession(creds.get("username"), creds.get("password"), creds.get("token"))
+        self.clients = [TruthClient(handle=h, session=self.sc) for h in dict.fromkeys(handles)]
+        self.max_workers = max_workers or getattr(settings, 'TRUTH_POLL_WORKERS', 8)
+
+    def get_new_posts(self):
+        # cursors are read on this thread; workers only do network I/O
+        for client in self.clients:
+            client.cursor(client.handle)
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(self.clients))) as pool:
+            batches = list(pool.map(self._fetch, self.clients))
+        posts = [status for fresh in batches for status in fresh]
+        posts.sort(key=lambda p: p.created_at)
+        return posts
+
     @staticmethod
-    def _chat(prompt: str, max_tokens: int = 8):
+    def _fetch(client):
+        try:
+            return client.fetch(client.handle)
+        except Exception:
+            # one failing handle must not hold back the others; its cursor is left where it was
+            log.exception("Failed to fetch posts for %s", client.handle)
+            return []
+
+
+class StreamingTruthClient(TruthClient):
+    """
+    Push-based ingestion: hold a server-sent-events connection to the Mastodon-style
+    streaming API and queue the handle's statuses as they arrive, reconnecting with
+    exponential backoff when the stream drops. Each (re)connect first polls since
+    the persisted cursor, so posts published while the stream was down are not lost.
+
+    The user stream carries the logged-in account's home timeline: the handle's
+    posts only arrive if that account follows it.
+    """
+    # run_bot does not sleep between calls: get_new_posts blocks until a post arrives
+    waits_for_posts = True
+
+    def __init__(self, url=None, token=None, handle=None):
+        super().__init__(handle)
+        self.url = url or getattr(settings, 'TRUTH_STREAM_URL', 'https://truthsocial.com/api/v1/streaming/user')
+        self.token = token or self.sc.auth_id
+        self.handle = handle or getattr(settings, 'TRUTH_HANDLE', 'realDonaldTrump')
+        self.wait = getattr(settings, 'TRUTH_STREAM_WAIT', 60)
+        self.backoff_max = getattr(settings, 'TRUTH_STREAM_BACKOFF_MAX', 60)
+        self.connects = 0
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='truth-stream', daemon=True)
+            self._thread.start()
+
+    def close(self):
+        self._stop.set()
+
+    def get_new_posts(self):
+        """
+        Wait up to TRUTH_STREAM_WAIT seconds for the first post, then return everything
+        queued so far, oldest-first, as SimpleNamespace(id, text, created_at, user_handle).
+        """
+        self.start()
+        try:
+            fresh = [self._queue.get(timeout=self.wait)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                fresh.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        self.last_seen = fresh[-1].id
+        return fresh
+
+    def _run(self):
+        initial = min(1.0, self.backoff_max)
+        delay = initial
+        while not self._stop.is_set():
+            connects = self.connects
+            try:
+                if not self.token:
+                    creds = settings.TRUTH_CREDENTIALS
+                    self.token = self.sc.get_auth_id(creds.get("username"), creds.get("password"))
+                self._consume()
+                log.info("Truth stream closed by server; reconnecting")
+            except Exception as e:
+                log.warning("Truth stream disconnected (%s)", e)
+            if self.connects > connects:
+                # the connection was up: start backing off from scratch
+                delay = initial
+            # full jitter so several clients do not reconnect in lockstep
+            self._stop.wait(random.uniform(delay / 2, delay))
+            delay = min(delay * 2, self.backoff_max)
+
+    def _consume(self):
+        request = urllib.request.Request(self.url, headers={
+            'Authorization': f'Bearer {self.token}',
+            'Accept': 'text/event-stream',
+        })
+        with urllib.request.urlopen(request, timeout=getattr(settings, 'TRUTH_STREAM_TIMEOUT', 90)) as response:
+            self.connects += 1
+            self._backfill()
+            event, data = None, []
+            for raw in response:
+                if self._stop.is_set():
+                    return
+                line = raw.decode('utf-8').rstrip('\r\n')
+                if not line:
+                    # blank line terminates an event
+                    if event == 'update' and data:
+                        self._handle_update('\n'.join(data))
+                    event, data = None, []
+                elif line.startswith(':'):
+                    continue  # heartbeat / comment
+                elif line.startswith('event:'):
+                    event = line[6:].strip()
+                elif line.startswith('data:'):
+                    data.append(line[5:].strip())
+
+    def _backfill(self):
+        # connected, so anything published from here on is streamed; poll for what came before
+        try:
+            self.cursor(self.handle)
+            for status in self.fetch(self.handle):
+                self._queue.put(status)
+        except Exception:
+            # the pipeline skips repeats, so a failed backfill is retried on the next connect
+            log.exception("Could not backfill %s after connecting", self.handle)
+        finally:
+            # this thread outlives any request cycle; do not hold its connection open
+            connection.close()
+
+    def _handle_update(self, payload: str):
+        try:
+            item = json.loads(payload)
+        except ValueError:
+            log.warning("Ignoring malformed stream update: %r", payload[:200])
+            return
+        acct = ((item.get('account') or {}).get('acct') or '').lower()
+        if acct != self.handle.lower():
+            return
+        status = parse_status(item, self.handle)
+        # cursor the pipeline checkpoints once this post is stored
+        status.source = self.handle
+        status.fetched_at = timezone.now()
+        self._queue.put(status)
+
+
+class NLPBackend(abc.ABC):
+    """
+    Interface for NLP_SERVICE_CLASS. Backends are used as classes (no instances):
+    process_post(text) -> (sector, sentiment) is required; classify_batch and cache
+    have defaults here. Implementations: NLPService (OpenAI) and, in
+    trading.nlp_backends, LexiconNLPService and ReplayNLPService (offline).
+    """
+
+    @classmethod
+    @abc.abstractmethod
+    def process_post(cls, post_text: str) -> tuple[str, str]:
+        """(sector, sentiment) for one post."""
+
+    @classmethod
+    def classify_batch(cls, texts: list[str]) -> list[tuple[str, str]]:
+        return [cls.process_post(text) for text in texts]
+
+    @classmethod
+    def cache(cls):
+        """Classification cache in front of this backend, or None."""
+        return None
+
+
+class NLPService(NLPBackend):
+    MODEL = "gpt-4o-mini"
+    # bump when prompts change so cached classifications are not reused
+    PROMPT_VERSION = "2"
+
+    @classmethod
+    def _chat(cls, prompt: str, max_tokens: int = 8, schema: dict | None = None):
         # configure API key at call time
         openai.api_key = settings.OPENAI_API_KEY
-        resp = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=max_tokens,
-        )
-        return resp.choices[0].message.content.strip()
+        extra = {}
+        if schema:
+            extra["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "classification", "strict": True, "schema": schema},
+            }
+        with latency.span("llm_classify"):
+            resp = openai.chat.completions.create(
+                model=cls.MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                temperature=0,
+                **extra,
+            )
+        choice = resp.choices[0]
+        if getattr(choice.message, "refusal", None):
+            raise ClassificationError(f"Refused: {choice.message.refusal}")
+        if choice.finish_reason == "length":
+            raise ClassificationError("Reply truncated at max_tokens")
+        return (choice.message.content or "").strip()
+
+    @classmethod
+    def _request(cls, prompt: str, max_tokens: int, schema: dict, parse, retries: int | None = None):
+        """
+        Chat and parse the reply. Unparseable replies are retried at once, transient API
+        errors after an exponential pause; raises ClassificationError when attempts run out.
+        """
+        if retries is None:
+            retries = getattr(settings, "NLP_MAX_RETRIES", 2)
+        for attempt in range(retries + 1):
+            try:
+                result = parse(cls._chat(prompt, max_tokens=max_tokens, schema=schema))
+            except ClassificationError as e:
+                error = e
+                LLM_REQUESTS.inc(outcome="invalid")
+                log.warning("invalid classification (attempt %d/%d): %s", attempt + 1, retries + 1, e)
+            except TRANSIENT_ERRORS as e:
+                error = e
+                LLM_REQUESTS.inc(outcome="transient")
+                log.warning("transient API error (attempt %d/%d): %s", attempt + 1, retries + 1, e)
+                if attempt < retries:
+                    time.sleep(getattr(settings, "NLP_RETRY_BACKOFF", 0.5) * 2 ** attempt)
+            except Exception:
+                LLM_REQUESTS.inc(outcome="error")
+                raise
+            else:
+                LLM_REQUESTS.inc(outcome="ok")
+                return result
+        raise ClassificationError(f"no valid classification after {retries + 1} attempts: {error}") from error
+
+    @staticmethod
+    def _parse_label(data) -> tuple[str, str]:
+        if not isinstance(data, dict) or data.get("sector") not in SECTORS or data.get("sentiment") not in SENTIMENTS:
+            raise ClassificationError(f"Invalid label: {data!r}")
+        return data["sector"], data["sentiment"]
 
+    @staticmethod
+    def _parse_json(raw: str):
+        try:
+            return json.loads(raw)
+        except ValueError:
+            raise ClassificationError(f"Invalid response: {raw}") from None
+
+    @classmethod
+    def cache(cls):
+        """Classification cache for this model/prompt version (None when disabled)."""
+        return get_classification_cache(f"{cls.__module__}.{cls.__qualname__}:{cls.MODEL}:{cls.PROMPT_VERSION}")
+
+    @classmethod
+    def _sector_and_sentiment(cls, text: str) -> tuple[str, str]:
+        # Sector and 5-point sentiment via structured output; raises ClassificationError if retries run out
+        prompt = "Sector and sentiment of this post's US market impact:\n\n" + text
+        return cls._request(prompt, 24, LABEL_SCHEMA, lambda raw: cls._parse_label(cls._parse_json(raw)))
 
     @classmethod
     def sector_and_sentiment(cls, text: str):
-        # Return sector and sentiment on a 5-point scale
-        prompt = (
-            'Return JSON {"sector":<one of ' + ', '.join(SECTORS) + ", " +
-            '"sentiment":<"strongly_bullish"|"bullish"|"neutral"|"bearish"|"strongly_bearish">} for the statement:\n\n'
-            + text
-        )
-        raw = cls._chat(prompt, max_tokens=64)
         try:
-            # extract JSON object across multiple lines
-            match = re.search(r"\{.*?\}", raw, flags=re.DOTALL)
-            if not match:
-                raise ValueError(f"Invalid response: {raw}")
-            data = json.loads(match.group(0))
-            sector = data.get("sector", "none")
-            sentiment = data.get("sentiment", "neutral")
-            return sector, sentiment
+            return cls._sector_and_sentiment(text)
+        except Exception as e:
+            log.error("classification failed: %s", e)
+            LLM_FAILURES.inc()
+            return UNCLASSIFIED
+
+    @classmethod
+    def _classify_and_store(cls, text: str, cache) -> tuple[str, str]:
+        # Single-post classification; failures come back UNCLASSIFIED and are not cached
+        try:
+            result = cls._sector_and_sentiment(text)
         except Exception as e:
-            log.error("parse error: %s", e)
-            return "none", "neutral"
+            log.error("classification failed: %s", e)
+            LLM_FAILURES.inc()
+            return UNCLASSIFIED
+        if cache:
+            cache.set(text, result)
+        return result
+
+    @classmethod
+    def classify_batch(cls, texts: list[str]) -> list[tuple[str, str]]:
+        """
+        Classify several posts per chat completion; returns [(sector, sentiment), ...] in input order.
+        Cached posts are not sent; chunks whose reply cannot be parsed fall back to one call per post.
+        """
+        texts = list(texts)
+        cache = cls.cache()
+        results = [cache.get(text) if cache else None for text in texts]
+        pending = [i for i, result in enumerate(results) if result is None]
+        batch_size = max(1, getattr(settings, 'NLP_BATCH_SIZE', 10))
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            if len(chunk) == 1:
+                results[chunk[0]] = cls._classify_and_store(texts[chunk[0]], cache)
+                continue
+            try:
+                labels = cls._classify_chunk([texts[i] for i in chunk])
+            except Exception as e:
+                log.warning("batch parse error, classifying %d posts individually: %s", len(chunk), e)
+                for i in chunk:
+                    results[i] = cls._classify_and_store(texts[i], cache)
+                continue
+            for i, label in zip(chunk, labels):
+                results[i] = label
+                if cache:
+                    cache.set(texts[i], label)
+        return results
+
+    @classmethod
+    def _classify_chunk(cls, texts: list[str]) -> list[tuple[str, str]]:
+        # One structured-output request for the chunk; not retried, failures fall back to per-post calls
+        prompt = (
+            "Sector and sentiment of each numbered post's US market impact, in order:\n\n"
+            + '\n'.join(f"{i}. {text}" for i, text in enumerate(texts, 1))
+        )
+
+        def parse(raw):
+            labels = cls._parse_json(raw)
+            labels = labels.get("labels") if isinstance(labels, dict) else None
+            if not isinstance(labels, list) or len(labels) != len(texts):
+                raise ClassificationError(f"Expected {len(texts)} labels, got: {raw}")
+            return [cls._parse_label(label) for label in labels]
+
+        return cls._request(prompt, 16 * len(texts) + 8, BATCH_SCHEMA, parse, retries=0)
 
     # convenience pipeline: returns (sector, sentiment)
     @classmethod
     def process_post(cls, post_text: str):
-        # Classify post into sector and sentiment (five-point scale)
-        sector, sentiment = cls.sector_and_sentiment(post_text)
-        return sector, sentiment
\ No newline at end of file
+        # Classify post into sector and sentiment (five-point scale), consulting the cache first
+        cache = cls.cache()
+        cached = cache.get(post_text) if cache else None
+        if cached:
+            return cached
+        return cls._classify_and_store(post_text, cache)
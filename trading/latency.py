@@ -0,0 +1,94 @@
+"""
+Per-post latency spans from signal (post created_at) to order (OptionTrade written).
+
+Code on the hot path wraps a stage in ``span('stage')``. Durations go to the list
+activated by ``collect()`` in the current context (thread), and nowhere when none
+is active. The pipeline collects one list per post and ``save()`` stores it as
+LatencySpan rows.
+
+Stages:
+  detect           post created_at -> fetched by the ingestion client
+  ingest_fetch     ingestion request(s) that returned the post
+  llm_classify     classification requests (summed over retries / batch share)
+  quote_fetch      underlying price lookup
+  chain_fetch      option-chain lookup
+  db_persist       post, trade and checkpoint write (includes trade_write)
+  trade_write      OptionTrade insert
+  signal_to_order  post created_at -> trade written
+  template_refresh one trade-template warmer pass (its quote/chain fetches are muted)
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils import timezone
+
+from .metrics import STAGE_SECONDS
+from .models import LatencySpan
+
+_current = contextvars.ContextVar('latency_spans', default=None)
+_muted = contextvars.ContextVar('latency_muted', default=False)
+
+
+@contextmanager
+def collect(spans: list | None = None):
+    """Route spans recorded in this context into `spans` (a new list if omitted) and yield it."""
+    spans = [] if spans is None else spans
+    token = _current.set(spans)
+    try:
+        yield spans
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def muted():
+    """Record no spans in this context, e.g. for background work off the signal path."""
+    token = _muted.set(True)
+    try:
+        yield
+    finally:
+        _muted.reset(token)
+
+
+@contextmanager
+def span(stage: str):
+    """Time the block as `stage`: into the stage histogram, and into the active collect() list if any (unless muted)."""
+    if _muted.get():
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        spans = _current.get()
+        if spans is not None:
+            spans.append((stage, elapsed))
+
+
+def totals(spans) -> dict:
+    """Seconds per stage, summing repeated stages."""
+    out = {}
+    for stage, seconds in spans:
+        out[stage] = out.get(stage, 0.0) + seconds
+    return out
+
+
+def save(post, spans, status=None, traded: bool = False):
+    """Store a post's spans (plus detect / signal_to_order from its timestamps) unless LATENCY_TRACKING is off."""
+    if not getattr(settings, 'LATENCY_TRACKING', True):
+        return []
+    stages = totals(spans)
+    created_at = getattr(status, 'created_at', None)
+    fetched_at = getattr(status, 'fetched_at', None)
+    if created_at is not None and timezone.is_aware(created_at):
+        if fetched_at is not None:
+            stages['detect'] = (fetched_at - created_at).total_seconds()
+        if traded:
+            stages['signal_to_order'] = (timezone.now() - created_at).total_seconds()
+    return LatencySpan.objects.bulk_create(
+        LatencySpan(post=post, stage=stage, seconds=seconds) for stage, seconds in stages.items()
+    )
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+Command to replay stored posts through the strategy using PriceFeed history.
+"""
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from trading import backtest
+from trading.models import Strategy
+from trading.timeutils import parse_utc
+
+
+def resolve_strategy(name_or_id: str, username: str) -> Strategy:
+    """Strategy by pk or name; created (owned by username) if no such name exists."""
+    if name_or_id.isdigit():
+        try:
+            return Strategy.objects.get(pk=int(name_or_id))
+        except Strategy.DoesNotExist:
+            raise CommandError(f"Strategy {name_or_id} does not exist")
+    strategy = Strategy.objects.filter(name=name_or_id).first()
+    if strategy is None:
+        user, _ = User.objects.get_or_create(username=username)
+        strategy = Strategy.objects.create(user=user, name=name_or_id, description='Created by backtest')
+    return strategy
+
+
+def parse_time(value, end: bool = False):
+    if value is None:
+        return None
+    try:
+        return parse_utc(value, end=end)
+    except ValueError:
+        raise CommandError(f"Invalid date/time: {value}") from None
+
+
+class Command(BaseCommand):
+    help = 'Backtest the strategy over stored posts, pricing from PriceFeed (no network access).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--strategy', default='backtest',
+                            help='Strategy id or name to record results against (default: backtest)')
+        parser.add_argument('--user', default='bullbot',
+                            help='Owner if the strategy has to be created')
+        parser.add_argument('--start', help='Only replay posts at or after this date/time (ISO 8601)')
+        parser.add_argument('--end', help='Only replay posts at or before this date/time (ISO 8601; a date includes that whole day)')
+        parser.add_argument('--profit_target', type=float, help='Profit target as a decimal (e.g., 0.1 for 10%)')
+        parser.add_argument('--expiry_days', type=int, help='Expiry this many days after the post (default: next Friday)')
+        parser.add_argument('--volatility', type=float, help='Annualised volatility for the premium model')
+        parser.add_argument('--source', dest='price_source', help='PriceFeed source to price from')
+        parser.add_argument('--decision', help='Dotted path of a decision function (post, params) -> (ticker, option_type)')
+        parser.add_argument('--dry-run', action='store_true', help='Print metrics without saving StrategyPerformance')
+
+    def handle(self, *args, **options):
+        strategy = resolve_strategy(options['strategy'], options['user'])
+        # defaults <- Strategy.parameters <- command line
+        try:
+            params = backtest.build_params(strategy.parameters, {
+                key: options[key]
+                for key in ('profit_target', 'expiry_days', 'volatility', 'price_source', 'decision')
+            })
+        except ValueError as e:
+            raise CommandError(f"Invalid parameters for strategy {strategy.name}: {e}") from None
+        start, end = parse_time(options['start']), parse_time(options['end'], end=True)
+        started = time.perf_counter()
+        data = backtest.load_data(params['sector_ticker'].values(), start, end, params['price_source'])
+        loaded = time.perf_counter()
+        result = backtest.run_backtest(data, params, initial_capital=float(strategy.initial_capital))
+        finished = time.perf_counter()
+        metrics = result['metrics']
+        self.stdout.write(
+            f"Replayed {len(data.posts)} posts in {finished - started:.2f}s "
+            f"(load {loaded - started:.2f}s, simulate {finished - loaded:.2f}s)"
+        )
+        for key, value in metrics.items():
+            self.stdout.write(f"  {key}: {value}")
+        if options['dry_run']:
+            return
+        perf = backtest.save_performance(strategy, result, params, start=start, end=end)
+        self.stdout.write(self.style.SUCCESS(f"Saved StrategyPerformance {perf.id} for {strategy.name}"))
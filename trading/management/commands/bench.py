@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+Command to run the offline hot-path benchmarks and write the results to JSON.
+"""
+import datetime
+import json
+import platform
+import subprocess
+from contextlib import nullcontext
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from trading import benchmarks
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Benchmark ingestion, classification parsing, trade decisions, inserts, closing and the positions page.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('only', nargs='*', help='Benchmark names (or prefixes) to run; default all')
+        parser.add_argument('--output', default=str(settings.BASE_DIR / 'bench_results.json'),
+                            help='JSON results file')
+        parser.add_argument('--compare', help='Earlier results file to report changes against')
+        parser.add_argument('--posts', type=int, default=500, help='Statuses per ingestion page')
+        parser.add_argument('--calls', type=int, default=2000, help='Classification replies parsed')
+        parser.add_argument('--decisions', type=int, default=200, help='decide_trade calls')
+        parser.add_argument('--trades', type=int, default=1000, help='Trades inserted / open trades closed')
+        parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000],
+                            help='Trade counts for the positions page')
+        parser.add_argument('--current-db', action='store_true',
+                            help='Use the configured database instead of a throwaway test database '
+                                 '(timings then depend on, and lock, existing rows)')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                baseline = json.loads(Path(options['compare']).read_text())['results']
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f"Cannot read {options['compare']}: {e}")
+        sizes = {key: options[key] for key in ('posts', 'calls', 'decisions', 'trades', 'rows')}
+        self.stdout.write(f"{'benchmark':<24}{'items':>9}{'best s':>10}{'µs/item':>11}{'items/s':>12}")
+
+        def log(name, result):
+            line = (f"{name:<24}{result['items']:>9}{result['best_s']:>10.3f}"
+                    f"{result['per_item_us']:>11.1f}{result['items_per_s'] or 0:>12,.0f}")
+            if baseline and name in baseline:
+                change = result['per_item_us'] / baseline[name]['per_item_us'] - 1
+                line += f"  {change:+.1%}"
+            self.stdout.write(line)
+
+        with nullcontext() if options['current_db'] else benchmarks.throwaway_database():
+            results = benchmarks.run_all(sizes, log, only=options['only'])
+        if not results:
+            raise CommandError(f"No benchmark matches {' '.join(options['only'])}")
+        report = {
+            'commit': git_commit(),
+            'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'throwaway_database': not options['current_db'],
+            'sizes': sizes,
+            'results': results,
+        }
+        Path(options['output']).write_text(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(results)} results to {options['output']}"))
@@ -2,9 +2,10 @@
 """
 Command to classify a provided post text and suggest an option trade.
 """
+from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
 
-from trading.injestion import NLPService
 from trading.execution import decide_trade
 
 
@@ -21,8 +22,9 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         text = options['text']
         self.stdout.write(f"Classifying text: {text}")
-        # Classify post
-        sector, sentiment = NLPService.process_post(text)
+        # Classify post with the configured backend
+        nlp_cls = import_string(settings.NLP_SERVICE_CLASS)
+        sector, sentiment = nlp_cls.process_post(text)
         strong = sentiment in ('strongly_bullish', 'strongly_bearish')
         self.stdout.write(f"Sector: {sector}")
         self.stdout.write(f"Sentiment: {sentiment}")
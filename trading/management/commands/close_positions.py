@@ -2,12 +2,47 @@
 """
 Command to close open OptionTrade positions when profitable.
 """
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
+
+import numpy as np
+import pandas as pd
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-import yfinance as yf
 
+from trading import market_data
 from trading.models import OptionTrade
+from trading.metrics import TRADES_CLOSED
+from trading.positions import invalidate_pnl_summary
+
+
+def mark_group(ticker: str, expiry, strikes: np.ndarray, is_call: np.ndarray):
+    """
+    Current option prices for trades sharing (ticker, expiry).
+
+    Uses the chain's lastPrice where the strike is listed, else intrinsic value
+    from the underlying close. Returns (prices, warnings); prices is a float
+    array with NaN where no market data was available.
+    """
+    warnings = []
+    prices = np.full(len(strikes), np.nan)
+    try:
+        for option_type, mask in (('CALL', is_call), ('PUT', ~is_call)):
+            if mask.any():
+                # exact strike only: a neighbouring contract would mis-mark the position
+                index = market_data.get_chain_index(ticker, expiry, option_type)
+                prices[mask] = index.lookup(strikes[mask], tolerance=0)['lastPrice']
+    except Exception as e:
+        warnings.append(f"Could not fetch option chain for {ticker} ({e}); skipping current price lookup")
+    missing = np.isnan(prices)
+    if missing.any():
+        hist = market_data.get_history(ticker)
+        if not hist.empty:
+            underlying = float(hist['Close'].iloc[-1])
+            intrinsic = np.where(is_call, underlying - strikes, strikes - underlying).clip(min=0)
+            prices[missing] = intrinsic[missing]
+    return prices, warnings
 
 
 class Command(BaseCommand):
@@ -20,51 +55,70 @@ class Command(BaseCommand):
             default=0.1,
             help='Profit target as a decimal (e.g., 0.1 for 10%)',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Number of (ticker, expiry) groups to fetch concurrently',
+        )
 
     def handle(self, *args, **options):
         profit_target = Decimal(str(options['profit_target']))
-        open_trades = OptionTrade.objects.filter(exit_price__isnull=True)
+        # no ORDER BY so the partial open-trades index can serve the scan; output is sorted by id below
+        open_trades = list(OptionTrade.objects.filter(exit_price__isnull=True))
         if not open_trades:
             self.stdout.write('No open trades to evaluate.')
             return
+        # One chain fetch per (ticker, expiry), however many positions share it
+        groups = defaultdict(list)
         for trade in open_trades:
-            # Determine current option market price via yfinance option chain
-            market_price = None
-            try:
-                ticker = yf.Ticker(trade.ticker)
-                expiry_str = trade.expiry.strftime('%Y-%m-%d')
-                opt_chain = ticker.option_chain(expiry_str)
-                df = opt_chain.calls if trade.option_type == 'CALL' else opt_chain.puts
-                # find matching strike
-                match = df[df['strike'] == float(trade.strike)]
-                if not match.empty:
-                    market_price = Decimal(str(match['lastPrice'].iloc[-1]))
-            except Exception as e:
+            groups[(trade.ticker, trade.expiry)].append(trade)
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            futures = {
+                key: pool.submit(
+                    mark_group, key[0], key[1],
+                    np.array([float(t.strike) for t in trades]),
+                    np.array([t.option_type == 'CALL' for t in trades]),
+                )
+                for key, trades in groups.items()
+            }
+        frames = []
+        for key, future in futures.items():
+            prices, warnings = future.result()
+            for msg in warnings:
+                self.stdout.write(self.style.WARNING(msg))
+            frames.append(pd.DataFrame({
+                'trade': groups[key],
+                'entry': [float(t.entry_price) for t in groups[key]],
+                'market': prices,
+            }))
+        marks = pd.concat(frames, ignore_index=True)
+        marks['id'] = [t.id for t in marks['trade']]
+        marks = marks.sort_values('id')
+        # vectorized P/L over every open position
+        with np.errstate(divide='ignore', invalid='ignore'):
+            marks['profit_pct'] = (marks['market'] - marks['entry']) / marks['entry']
+        marks['close'] = marks['profit_pct'] >= float(profit_target)
+        now = timezone.now()
+        closed = []
+        for row in marks.itertuples(index=False):
+            trade = row.trade
+            if np.isnan(row.market):
                 self.stdout.write(self.style.WARNING(
-                    f"Could not fetch option chain for {trade.ticker} ({e}); skipping current price lookup"
-                ))
-            # fallback to intrinsic if market_price unavailable
-            if market_price is None:
-                hist = yf.Ticker(trade.ticker).history(period='1d')
-                if hist.empty:
-                    self.stdout.write(self.style.WARNING(
-                        f"No market data for {trade.ticker}, skipping {trade.id}"))
-                    continue
-                underlying = Decimal(hist['Close'].iloc[-1])
-                if trade.option_type == 'CALL':
-                    market_price = max(Decimal('0'), underlying - trade.strike)
-                else:
-                    market_price = max(Decimal('0'), trade.strike - underlying)
-            # calculate profit percentage
-            profit_pct = (market_price - trade.entry_price) / trade.entry_price
-            threshold = profit_target
-            if profit_pct >= threshold:
-                trade.exit_price = market_price.quantize(Decimal('0.01'))
-                trade.exit_timestamp = timezone.now()
-                trade.save()
+                    f"No market data for {trade.ticker}, skipping {trade.id}"))
+                continue
+            if row.close:
+                trade.exit_price = Decimal(str(row.market)).quantize(Decimal('0.01'))
+                trade.exit_timestamp = now
+                closed.append(trade)
                 self.stdout.write(self.style.SUCCESS(
-                    f"Closed trade {trade.id}: entry={trade.entry_price}, exit={trade.exit_price}, P/L={profit_pct:.2%}"))
+                    f"Closed trade {trade.id}: entry={trade.entry_price}, exit={trade.exit_price}, P/L={row.profit_pct:.2%}"))
             else:
                 self.stdout.write(
-                    f"Trade {trade.id} not yet profitable (P/L={profit_pct:.2%}, threshold={threshold:.2%})"
-                )
\ No newline at end of file
+                    f"Trade {trade.id} not yet profitable (P/L={row.profit_pct:.2%}, threshold={profit_target:.2%})"
+                )
+        if closed:
+            OptionTrade.objects.bulk_update(closed, ['exit_price', 'exit_timestamp'])
+            # bulk_update sends no post_save signals
+            invalidate_pnl_summary()
+            TRADES_CLOSED.inc(len(closed))
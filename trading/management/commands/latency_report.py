@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""
+Command to print per-stage latency percentiles from recorded LatencySpan rows.
+"""
+import datetime
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from trading.models import LatencySpan
+
+# pipeline order; stages not listed here are printed after these
+STAGE_ORDER = [
+    'detect', 'ingest_fetch', 'llm_classify', 'quote_fetch', 'chain_fetch',
+    'db_persist', 'trade_write', 'signal_to_order',
+]
+
+
+class Command(BaseCommand):
+    help = 'Show p50/p95/p99 latency per pipeline stage (post created_at -> trade written).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=None, help='Only spans recorded in the last N hours')
+        parser.add_argument('--stage', action='append', help='Only these stages (repeatable)')
+
+    def handle(self, *args, **options):
+        spans = LatencySpan.objects.all()
+        if options['hours']:
+            spans = spans.filter(recorded_at__gte=timezone.now() - datetime.timedelta(hours=options['hours']))
+        if options['stage']:
+            spans = spans.filter(stage__in=options['stage'])
+        by_stage = {}
+        for stage, seconds in spans.values_list('stage', 'seconds').iterator(chunk_size=5000):
+            by_stage.setdefault(stage, []).append(seconds)
+        if not by_stage:
+            self.stdout.write('No latency spans recorded.')
+            return
+        order = {stage: i for i, stage in enumerate(STAGE_ORDER)}
+        self.stdout.write(f"{'stage':<16}{'count':>8}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'max ms':>11}")
+        for stage in sorted(by_stage, key=lambda s: (order.get(s, len(order)), s)):
+            values = np.asarray(by_stage[stage]) * 1000
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            self.stdout.write(
+                f"{stage:<16}{len(values):>8}{p50:>11.1f}{p95:>11.1f}{p99:>11.1f}{values.max():>11.1f}"
+            )
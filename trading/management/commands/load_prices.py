@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+Command to bulk-load OHLCV bars into PriceFeed from CSV/Parquet files or yfinance.
+"""
+import time
+from pathlib import Path
+
+import pandas as pd
+import yfinance as yf
+from django.core.management.base import BaseCommand, CommandError
+
+from trading.models import PriceFeed, Token
+
+OHLCV = ['open', 'high', 'low', 'close', 'volume']
+TIMESTAMP_COLUMNS = ('timestamp', 'datetime', 'date', 'time')
+
+
+def normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Map a raw OHLCV frame (any column case, timestamp column or index) to timestamp + OHLCV columns."""
+    if not any(str(c).lower() in TIMESTAMP_COLUMNS for c in df.columns):
+        df = df.reset_index()
+    df = df.rename(columns={c: str(c).lower() for c in df.columns})
+    ts_col = next((c for c in TIMESTAMP_COLUMNS if c in df.columns), None)
+    missing = [c for c in OHLCV[:4] if c not in df.columns]
+    if ts_col is None or missing:
+        raise CommandError(f"Input needs a timestamp column and {', '.join(OHLCV[:4])}; missing {missing or ['timestamp']}")
+    out = pd.DataFrame({'timestamp': pd.to_datetime(df[ts_col], utc=True)})
+    for col in OHLCV:
+        out[col] = pd.to_numeric(df[col], errors='coerce') if col in df.columns else 0.0
+    out['volume'] = out['volume'].fillna(0.0)
+    return out.dropna()
+
+
+def iter_file_chunks(path: Path, chunk_size: int):
+    """Yield raw DataFrames from a CSV or Parquet file without reading it all at once."""
+    suffix = path.suffix.lower()
+    if suffix in ('.parquet', '.pq'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise CommandError('Parquet input requires pyarrow (pip install pyarrow)')
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def iter_yfinance_chunks(symbol: str, chunk_size: int, **history_kwargs):
+    """Download history once from yfinance and yield it in chunks."""
+    df = yf.Ticker(symbol).history(**{k: v for k, v in history_kwargs.items() if v})
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+def upsert_bars(token: Token, source: str, frame: pd.DataFrame, batch_size: int) -> int:
+    """Insert or update bars on (token, timestamp, source); returns rows written."""
+    rows = [
+        PriceFeed(token=token, source=source, timestamp=ts.to_pydatetime(),
+                  open=o, high=h, low=lo, close=c, volume=v)
+        for ts, o, h, lo, c, v in frame[['timestamp'] + OHLCV].itertuples(index=False, name=None)
+    ]
+    PriceFeed.objects.bulk_create(
+        rows, batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['token', 'timestamp', 'source'],
+        update_fields=OHLCV,
+    )
+    return len(rows)
+
+
+class Command(BaseCommand):
+    help = 'Load OHLCV bars into PriceFeed (idempotent upsert) from a CSV/Parquet file or a yfinance download.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('symbol', help='Token symbol the bars belong to (created if missing)')
+        parser.add_argument('--file', help='CSV or Parquet file with timestamp/open/high/low/close[/volume] columns')
+        parser.add_argument('--yfinance', action='store_true', help='Download bars from yfinance instead of a file')
+        parser.add_argument('--period', default=None, help="yfinance period (e.g. '1y', 'max')")
+        parser.add_argument('--interval', default='1d', help="yfinance bar interval (e.g. '1m', '1h', '1d')")
+        parser.add_argument('--start', help='yfinance start date (YYYY-MM-DD)')
+        parser.add_argument('--end', help='yfinance end date (YYYY-MM-DD)')
+        parser.add_argument('--source', help="PriceFeed source (default: 'yfinance' or 'import')")
+        parser.add_argument('--network', default='ethereum', help='Token network if the token has to be created')
+        parser.add_argument('--address', default='', help='Token address if the token has to be created')
+        parser.add_argument('--chunk-size', type=int, default=10000, help='Rows read and upserted per chunk')
+
+    def handle(self, *args, **options):
+        if bool(options['file']) == options['yfinance']:
+            raise CommandError('Pass exactly one of --file or --yfinance')
+        symbol, chunk_size = options['symbol'], max(1, options['chunk_size'])
+        token, _ = Token.objects.get_or_create(
+            symbol=symbol, network=options['network'], defaults={'address': options['address']},
+        )
+        if options['yfinance']:
+            source = options['source'] or 'yfinance'
+            chunks = iter_yfinance_chunks(
+                symbol, chunk_size, period=options['period'] or (None if options['start'] else 'max'),
+                interval=options['interval'], start=options['start'], end=options['end'],
+            )
+        else:
+            path = Path(options['file'])
+            if not path.is_file():
+                raise CommandError(f"No such file: {path}")
+            source = options['source'] or 'import'
+            chunks = iter_file_chunks(path, chunk_size)
+        started = time.perf_counter()
+        total = 0
+        for raw in chunks:
+            total += upsert_bars(token, source, normalize_frame(raw), batch_size=chunk_size)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"  {total} rows ({total / elapsed if elapsed else 0:,.0f} rows/s)")
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Upserted {total} {symbol} bars from {source} in {elapsed:.2f}s ({rate:,.0f} rows/s)"
+        ))
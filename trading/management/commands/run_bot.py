@@ -3,15 +3,17 @@
 Django management command to run the bullbot pipeline:
 ingest Truth Social posts, classify with OpenAI, decide trades, and simulate paper options.
 """
+import argparse
 import time
-import datetime
 from django.core.management.base import BaseCommand
 from django.conf import settings
 from django.utils.module_loading import import_string
-from django.utils import timezone
 
-from trading.execution import Simulator
-from trading.models import Post
+from trading import metrics, trade_templates
+from trading.execution import SECTOR_TICKER, Simulator, price_trade
+from trading.pipeline import PostPipeline
+from trading.prefilter import load_prefilter
+from trading.scheduler import PollScheduler
 
 
 class Command(BaseCommand):
@@ -23,38 +25,52 @@ class Command(BaseCommand):
             action='store_true',
             help='Run one iteration and exit',
         )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=getattr(settings, 'PIPELINE_CONCURRENCY', 1),
+            help='Number of trades to price concurrently (trades are still written in post order)',
+        )
+        parser.add_argument(
+            '--metrics-port',
+            type=int,
+            default=getattr(settings, 'METRICS_PORT', 0),
+            help='Serve Prometheus metrics on this port at /metrics (0 = off)',
+        )
+        parser.add_argument(
+            '--warm-templates',
+            action=argparse.BooleanOptionalAction,
+            default=getattr(settings, 'TRADE_TEMPLATES_ENABLED', False),
+            help='Keep ATM CALL/PUT trades pre-priced for every sector ETF so strong signals skip market-data fetches',
+        )
 
     def handle(self, *args, **options):
         # Instantiate ingestion and NLP services from settings
         ingestion_cls = import_string(settings.INGESTION_CLASS)
         nlp_cls = import_string(settings.NLP_SERVICE_CLASS)
         tc = ingestion_cls()
-        simulator = Simulator()
+        pipeline = PostPipeline(nlp_cls, Simulator(), concurrency=options['concurrency'], prefilter=load_prefilter())
         once = options.get('once', False)
         self.stdout.write(self.style.NOTICE('Starting bullbot pipeline...'))
+        if options['metrics_port']:
+            address = getattr(settings, 'METRICS_ADDRESS', '127.0.0.1')
+            metrics.serve(options['metrics_port'], address)
+            self.stdout.write(f"Serving metrics on {address}:{options['metrics_port']}/metrics")
+        if options['warm_templates']:
+            warmer = trade_templates.start(price_trade, [t for t in SECTOR_TICKER.values() if t])
+            self.stdout.write(f"Warming trade templates for {len(warmer.targets)} contracts every {warmer.interval:g}s")
+        cache = nlp_cls.cache() if hasattr(nlp_cls, 'cache') else None
+        scheduler = PollScheduler()
         while True:
             posts = tc.get_new_posts()
-            for p in posts:
+            skipped = pipeline.skipped
+            for result in pipeline.run(posts):
+                p = result.status
                 self.stdout.write(f"Processing post {p.id} at {getattr(p, 'created_at', '')}")
-                # Classify post: get sector and sentiment
-                sector, sentiment = nlp_cls.process_post(p.text)
-                # Persist post
-                post, created = Post.objects.get_or_create(
-                    tweet_id=p.id,
-                    defaults={
-                        'user_handle': getattr(p, 'user_handle', ''),
-                        'text': p.text,
-                        'timestamp': getattr(p, 'created_at', timezone.now()),
-                        'sector': sector,
-                        'sentiment': sentiment,
-                    }
-                )
                 # Only execute trades on strong signals
-                strong = sentiment in ('strongly_bullish', 'strongly_bearish')
-                if strong:
-                    trade = simulator.create_trade(post)
-                    if trade:
-                        self.stdout.write(self.style.SUCCESS(f"Simulated trade: {trade}"))
+                if result.strong:
+                    if result.trade:
+                        self.stdout.write(self.style.SUCCESS(f"Simulated trade: {result.trade}"))
                     else:
                         self.stdout.write(self.style.WARNING(
                             "Trade simulation returned no result (check execution logic)"
@@ -62,10 +78,21 @@ class Command(BaseCommand):
                 else:
                     # Weak or neutral signals: no trade executed
                     self.stdout.write(self.style.WARNING(
-                        f"Signal '{sentiment}' not strong enough; no trade executed"
+                        f"Signal '{result.sentiment}' not strong enough; no trade executed"
                     ))
+            if pipeline.skipped > skipped:
+                self.stdout.write(f"Skipped {pipeline.skipped - skipped} already-processed posts")
+            if posts and cache:
+                stats = cache.stats()
+                self.stdout.write(f"Classification cache: {stats['hits']} hits, {stats['misses']} misses")
+            if posts and pipeline.prefilter:
+                stats = pipeline.prefilter.stats()
+                self.stdout.write(f"Pre-filter: {stats['skipped']} LLM calls skipped, {stats['passed']} posts classified")
             if once:
                 self.stdout.write(self.style.NOTICE('Completed one iteration, exiting.'))
+                trade_templates.stop()
                 break
-            # sleep before next poll
-            time.sleep(getattr(settings, 'POLL_INTERVAL', 60))
+            # sleep before next poll (streaming clients block inside get_new_posts instead)
+            if not getattr(tc, 'waits_for_posts', False):
+                scheduler.record(len(posts))
+                time.sleep(scheduler.next_delay())
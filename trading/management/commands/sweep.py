@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""
+Command to backtest a grid of strategy parameters in parallel.
+"""
+import itertools
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+
+from trading import backtest
+from trading.management.commands.backtest import parse_time, resolve_strategy
+
+# Grid keys a sweep may vary; each maps to a list of candidate values
+SWEEP_KEYS = ('profit_target', 'sentiments', 'sector_ticker', 'expiry_days', 'volatility', 'decision')
+
+
+def expand_grid(grid: dict) -> list[dict]:
+    """Cartesian product of {key: [values]} as a list of override dicts."""
+    unknown = set(grid) - set(SWEEP_KEYS)
+    if unknown:
+        raise CommandError(f"Unknown sweep keys: {', '.join(sorted(unknown))}")
+    keys = sorted(grid)
+    values = [v if isinstance(v, list) else [v] for v in (grid[k] for k in keys)]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+
+_worker_data = None
+
+
+def _init_worker(data):
+    # Django must be set up to unpickle tasks under 'spawn'; data is shipped once per worker, not per task
+    global _worker_data
+    django.setup()
+    _worker_data = data
+
+
+def _run_one(params, initial_capital, data=None):
+    # Worker entry point: pure computation on pre-loaded data, no DB access
+    result = backtest.run_backtest(data if data is not None else _worker_data, params, initial_capital)
+    return result['metrics'], result['trades']
+
+
+class Command(BaseCommand):
+    help = 'Backtest every combination in a parameter grid on a process pool and record each result.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('grid', help='JSON object (or path to a JSON file) of {parameter: [values, ...]}')
+        parser.add_argument('--strategy', default='backtest',
+                            help='Strategy id or name whose parameters are the base of every combination')
+        parser.add_argument('--user', default='bullbot', help='Owner if the strategy has to be created')
+        parser.add_argument('--start', help='Only replay posts at or after this date/time (ISO 8601)')
+        parser.add_argument('--end', help='Only replay posts at or before this date/time (ISO 8601; a date includes that whole day)')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Worker processes (default: all cores; 1 runs in-process)')
+
+    def handle(self, *args, **options):
+        raw = options['grid']
+        try:
+            grid = json.loads(Path(raw).read_text() if Path(raw).is_file() else raw)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Invalid grid: {e}")
+        combos = expand_grid(grid)
+        strategy = resolve_strategy(options['strategy'], options['user'])
+        start, end = parse_time(options['start']), parse_time(options['end'], end=True)
+        runs = []
+        for combo in combos:
+            try:
+                runs.append(backtest.build_params(strategy.parameters, combo))
+            except ValueError as e:
+                raise CommandError(f"Invalid combination {json.dumps(combo, sort_keys=True)}: {e}") from None
+        # Load posts and every ticker any combination can trade, once
+        tickers = {t for params in runs for t in params['sector_ticker'].values() if t}
+        sources = {params['price_source'] for params in runs}
+        if len(sources) > 1:
+            raise CommandError('All combinations must price from the same PriceFeed source')
+        data = backtest.load_data(tickers, start, end, sources.pop())
+        capital = float(strategy.initial_capital)
+        self.stdout.write(f"Sweeping {len(runs)} combinations over {len(data.posts)} posts...")
+        started = time.perf_counter()
+        if options['workers'] == 1:
+            results = [_run_one(params, capital, data) for params in runs]
+        else:
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker, initargs=(data,)) as pool:
+                results = list(pool.map(_run_one, runs, itertools.repeat(capital)))
+        elapsed = time.perf_counter() - started
+        for combo, params, (metrics, trades) in zip(combos, runs, results):
+            perf = backtest.save_performance(
+                strategy, {'metrics': metrics, 'trades': trades}, params,
+                start=start, end=end, extra={'sweep': combo},
+            )
+            self.stdout.write(
+                f"[{perf.id}] {json.dumps(combo, sort_keys=True)}: trades={metrics['num_trades']} "
+                f"net={metrics['net_profit']:.2f} win={metrics['win_rate']:.1f}%"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Completed {len(runs)} backtests in {elapsed:.2f}s"))
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""
+Command to train the local relevance pre-filter from LLM-classified posts.
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from trading.prefilter import RelevanceFilter, training_data
+
+
+class Command(BaseCommand):
+    help = 'Fit the naive Bayes pre-filter on stored posts, save it and report how many LLM calls it would skip.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=None, help='Model path (default: PREFILTER_MODEL_PATH)')
+        parser.add_argument('--threshold', type=float, default=None,
+                            help='Gate threshold to evaluate (default: PREFILTER_THRESHOLD)')
+        parser.add_argument('--min-count', type=int, default=2, help='Ignore tokens seen in fewer posts')
+
+    def handle(self, *args, **options):
+        texts, labels = training_data()
+        try:
+            model = RelevanceFilter.fit(texts, labels, threshold=options['threshold'], min_count=options['min_count'])
+        except ValueError as e:
+            raise CommandError(f"{e} ({len(texts)} classified posts)")
+        output = options['output'] or settings.PREFILTER_MODEL_PATH
+        model.save(output)
+
+        # in-sample report at the chosen threshold
+        started = time.perf_counter()
+        keep = [model.score(text) >= model.threshold for text in texts]
+        elapsed = time.perf_counter() - started
+        actionable = sum(labels)
+        missed = sum(1 for k, label in zip(keep, labels) if label and not k)
+        skipped = keep.count(False)
+        self.stdout.write(
+            f"Trained on {len(texts)} posts ({actionable} actionable), {len(model.weights)} tokens; "
+            f"{elapsed / len(texts) * 1e6:.1f} µs/post"
+        )
+        self.stdout.write(
+            f"At threshold {model.threshold}: {skipped} of {len(texts)} LLM calls skipped "
+            f"({skipped * 100 / len(texts):.1f}%), {missed} of {actionable} actionable posts missed"
+        )
+        self.stdout.write(self.style.SUCCESS(f"Saved pre-filter to {output}"))
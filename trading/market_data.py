@@ -0,0 +1,166 @@
+"""
+Short-lived cache of underlying quotes and option chains fetched from yfinance.
+
+decide_trade and close_positions both read through this module, so a close
+pass fetches each (ticker, expiry) chain once however many positions share it.
+Concurrent requests for a key that is already being fetched wait for that
+fetch instead of issuing their own.
+"""
+import datetime
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+import yfinance as yf
+from django.conf import settings
+
+
+class TTLCache:
+    """Thread-safe TTL cache with in-flight request coalescing."""
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._values = {}      # key -> (expires_at, value)
+        self._inflight = {}    # key -> Future
+        self._lock = threading.Lock()
+        self._next_prune = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for key, calling loader() at most once per TTL window."""
+        with self._lock:
+            entry = self._values.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                self.misses += 1
+                future = self._inflight[key] = Future()
+            else:
+                self.hits += 1
+        if not leader:
+            return future.result()
+        try:
+            value = loader()
+        except BaseException as e:
+            # failures are not cached; waiters see the same exception
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            if self.ttl > 0:
+                now = time.monotonic()
+                self._values[key] = (now + self.ttl, value)
+                if now >= self._next_prune:
+                    self._prune(now)
+            del self._inflight[key]
+        future.set_result(value)
+        return value
+
+    def _prune(self, now: float):
+        # at most once per TTL, drop expired entries so keys nobody asks for again do not pile up
+        for key in [k for k, (expires_at, _) in self._values.items() if expires_at <= now]:
+            del self._values[key]
+        self._next_prune = now + self.ttl
+
+    def __len__(self):
+        with self._lock:
+            return len(self._values)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class ChainIndex:
+    """
+    One side (calls or puts) of an option chain, sorted by strike once so
+    strike lookups are a binary search instead of a scan of the DataFrame.
+    """
+    COLUMNS = ('bid', 'ask', 'lastPrice')
+
+    def __init__(self, df):
+        df = df.drop_duplicates('strike', keep='last').sort_values('strike')
+        self.strikes = df['strike'].to_numpy(dtype=float)
+        self.columns = {
+            col: (df[col].to_numpy(dtype=float) if col in df else np.full(len(df), np.nan))
+            for col in self.COLUMNS
+        }
+
+    def __len__(self):
+        return len(self.strikes)
+
+    def lookup(self, strikes, tolerance: float | None = None) -> dict:
+        """
+        Resolve many strikes at once to the nearest listed strike.
+
+        Returns arrays keyed 'strike', 'bid', 'ask', 'lastPrice' and a boolean
+        'found'; entries further than tolerance from any listed strike (or all
+        entries, for an empty chain) are not found and hold NaN.
+        """
+        query = np.atleast_1d(np.asarray(strikes, dtype=float))
+        if not len(self.strikes):
+            nan = np.full(len(query), np.nan)
+            return {'strike': nan, 'found': np.zeros(len(query), dtype=bool), **{c: nan for c in self.COLUMNS}}
+        right = np.searchsorted(self.strikes, query).clip(max=len(self.strikes) - 1)
+        left = (right - 1).clip(min=0)
+        # ties go to the lower strike
+        pick = np.where(np.abs(self.strikes[left] - query) <= np.abs(self.strikes[right] - query), left, right)
+        found = np.ones(len(query), dtype=bool)
+        if tolerance is not None:
+            found = np.abs(self.strikes[pick] - query) <= tolerance
+        result = {'strike': np.where(found, self.strikes[pick], np.nan), 'found': found}
+        for col, values in self.columns.items():
+            result[col] = np.where(found, values[pick], np.nan)
+        return result
+
+    def nearest(self, strike: float, tolerance: float | None = None) -> dict | None:
+        """Nearest listed contract to strike as {'strike', 'bid', 'ask', 'lastPrice'} (NaN -> None)."""
+        result = self.lookup([strike], tolerance)
+        if not result['found'][0]:
+            return None
+        return {
+            key: (None if np.isnan(result[key][0]) else float(result[key][0]))
+            for key in ('strike',) + self.COLUMNS
+        }
+
+
+_cache = TTLCache(getattr(settings, 'MARKET_DATA_TTL', 5.0))
+
+
+def _expiry_str(expiry) -> str:
+    if isinstance(expiry, (datetime.date, datetime.datetime)):
+        return expiry.strftime('%Y-%m-%d')
+    return str(expiry)
+
+
+def get_history(ticker: str):
+    """Latest daily bar DataFrame for ticker (yfinance history(period='1d'))."""
+    return _cache.get_or_load(('quote', ticker), lambda: yf.Ticker(ticker).history(period='1d'))
+
+
+def get_option_chain(ticker: str, expiry):
+    """Option chain (calls/puts DataFrames) for ticker at expiry (date or 'YYYY-MM-DD')."""
+    expiry = _expiry_str(expiry)
+    return _cache.get_or_load(('chain', ticker, expiry), lambda: yf.Ticker(ticker).option_chain(expiry))
+
+
+def get_chain_index(ticker: str, expiry, option_type: str) -> ChainIndex:
+    """Strike index over the CALL or PUT side of the (ticker, expiry) chain, built once per fetch."""
+    expiry = _expiry_str(expiry)
+    def build():
+        opt_chain = get_option_chain(ticker, expiry)
+        return ChainIndex(opt_chain.calls if option_type == 'CALL' else opt_chain.puts)
+    return _cache.get_or_load(('index', ticker, expiry, option_type), build)
+
+
+def clear_cache():
+    _cache.clear()
+
+
+def cache_stats() -> dict:
+    return {'hits': _cache.hits, 'misses': _cache.misses}
@@ -0,0 +1,217 @@
+"""
+In-process metrics registry rendered in the Prometheus text format.
+
+Counters, gauges and histograms are plain dicts behind a per-metric lock, so
+updating one on the hot path costs a lock and a dict lookup. Each process
+has its own registry. Ingestion, LLM and trade events happen in run_bot,
+which serves the full registry on an optional sidecar port (--metrics-port).
+The web app's /metrics serves only WEB_METRICS, the gauges queried from the
+database at scrape time, since its own counters would always read zero.
+"""
+import bisect
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.db import connections
+
+from .models import OptionTrade
+
+log = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _labels(names, values, extra=()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + [f'{n}="{v}"' for n, v in extra]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def samples(self):
+        """(suffix, label values, extra labels, value) tuples to render."""
+        with self._lock:
+            return [('', key, (), value) for key, value in self._values.items()]
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        for suffix, key, extra, value in self.samples():
+            lines.append(f'{self.name}{suffix}{_labels(self.labelnames, key, extra)} {_number(value)}')
+        return lines
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def __init__(self, name, help, labelnames=(), function=None):
+        super().__init__(name, help, labelnames)
+        # evaluated at scrape time instead of being pushed (unlabelled gauges only)
+        self.function = function
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        if self.function is not None:
+            return [('', (), (), self.function())]
+        return super().samples()
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # per-bucket counts (last slot = +Inf), sum, count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        out = []
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._values.items()]
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float('inf'),), counts):
+                cumulative += n
+                out.append(('_bucket', key, (('le', _number(bound)),), cumulative))
+            out.append(('_sum', key, (), total))
+            out.append(('_count', key, (), count))
+        return out
+
+    def value(self, **labels):
+        """Number of observations."""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[2] if state else 0
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self, names=None) -> str:
+        """Text exposition of every metric, or only those named in `names`."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            if names is not None and metric.name not in names:
+                continue
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                # e.g. a scrape-time gauge whose query failed; skip it rather than fail the scrape
+                log.warning("Could not render metric %s: %s", metric.name, e)
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def _open_positions() -> int:
+    return OptionTrade.objects.filter(exit_price__isnull=True).count()
+
+
+POSTS_INGESTED = REGISTRY.register(Counter('bullbot_posts_ingested_total', 'Posts received from ingestion'))
+POSTS_SKIPPED = REGISTRY.register(Counter(
+    'bullbot_posts_skipped_total', 'Posts not sent to the classifier', ['reason']))
+LLM_REQUESTS = REGISTRY.register(Counter(
+    'bullbot_llm_requests_total', 'Classification requests by outcome', ['outcome']))
+LLM_FAILURES = REGISTRY.register(Counter(
+    'bullbot_llm_failures_total', 'Posts left unclassified after retries'))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    'bullbot_classification_cache_lookups_total', 'Classification cache lookups', ['result']))
+TEMPLATE_LOOKUPS = REGISTRY.register(Counter(
+    'bullbot_trade_template_lookups_total', 'Pre-priced trade template lookups (see trading.trade_templates)', ['result']))
+TRADES_OPENED = REGISTRY.register(Counter('bullbot_trades_opened_total', 'Paper trades opened', ['option_type']))
+TRADES_CLOSED = REGISTRY.register(Counter('bullbot_trades_closed_total', 'Paper trades closed'))
+OPEN_POSITIONS = REGISTRY.register(Gauge(
+    'bullbot_open_positions', 'Open paper trades (queried at scrape time)', function=_open_positions))
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    'bullbot_stage_seconds', 'Pipeline stage latency (see trading.latency)', ['stage']))
+
+# Process-independent metrics (read from the database at scrape time) served by the web app
+WEB_METRICS = (OPEN_POSITIONS.name,)
+
+
+def serve(port: int, address: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """Serve REGISTRY at http://address:port/metrics from a daemon thread."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            try:
+                body = REGISTRY.render().encode()
+            finally:
+                # scrape-time gauges query the DB from this short-lived thread
+                connections.close_all()
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((address, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    return server
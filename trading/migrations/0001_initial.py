@@ -0,0 +1,207 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Post',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tweet_id', models.CharField(max_length=50, unique=True)),
+                ('user_handle', models.CharField(max_length=100)),
+                ('text', models.TextField()),
+                ('timestamp', models.DateTimeField()),
+                ('inserted_at', models.DateTimeField(auto_now_add=True)),
+                ('sector', models.CharField(default='none', max_length=50)),
+                ('sentiment', models.CharField(blank=True, default='', max_length=10)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SystemLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message', models.TextField()),
+                ('level', models.CharField(choices=[('INFO', 'Info'), ('WARNING', 'Warning'), ('ERROR', 'Error')], default='INFO', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Token',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=20)),
+                ('address', models.CharField(max_length=100)),
+                ('decimals', models.IntegerField(default=18)),
+                ('network', models.CharField(choices=[('ethereum', 'Ethereum'), ('arbitrum', 'Arbitrum'), ('optimism', 'Optimism'), ('polygon', 'Polygon')], max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='OptionTrade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticker', models.CharField(max_length=10)),
+                ('option_type', models.CharField(choices=[('CALL', 'Call'), ('PUT', 'Put')], max_length=4)),
+                ('strike', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('expiry', models.DateField()),
+                ('entry_price', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('exit_price', models.DecimalField(blank=True, decimal_places=8, max_digits=20, null=True)),
+                ('entry_timestamp', models.DateTimeField(auto_now_add=True)),
+                ('exit_timestamp', models.DateTimeField(blank=True, null=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='option_trades', to='trading.post')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SentimentScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sentiment_value', models.FloatField()),
+                ('model_version', models.CharField(default='1.0', max_length=50)),
+                ('scored_at', models.DateTimeField(auto_now_add=True)),
+                ('tweet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sentiment_scores', to='trading.post')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Strategy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('description', models.TextField(blank=True)),
+                ('is_live', models.BooleanField(default=False)),
+                ('initial_capital', models.DecimalField(decimal_places=4, default=0, max_digits=20)),
+                ('base_asset', models.CharField(default='USDC', max_length=50)),
+                ('parameters', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='strategies', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AlgoModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('version', models.CharField(default='1.0', max_length=50)),
+                ('model_file_path', models.CharField(blank=True, max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('strategy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='algomodels', to='trading.strategy')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Alert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alert_type', models.CharField(choices=[('PRICE_THRESHOLD', 'Price Threshold'), ('SENTIMENT_SPIKE', 'Sentiment Spike'), ('ARBITRAGE_OPP', 'Arbitrage Opportunity')], max_length=50)),
+                ('message', models.TextField()),
+                ('trigger_data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('strategy', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='trading.strategy')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StrategyPerformance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_time', models.DateTimeField()),
+                ('end_time', models.DateTimeField(blank=True, null=True)),
+                ('net_profit', models.DecimalField(decimal_places=8, default=0, max_digits=20)),
+                ('net_profit_pct', models.DecimalField(decimal_places=4, default=0, max_digits=7)),
+                ('drawdown_pct', models.DecimalField(decimal_places=4, default=0, max_digits=7)),
+                ('sharpe_ratio', models.DecimalField(blank=True, decimal_places=4, max_digits=7, null=True)),
+                ('sortino_ratio', models.DecimalField(blank=True, decimal_places=4, max_digits=7, null=True)),
+                ('num_trades', models.IntegerField(default=0)),
+                ('win_rate', models.DecimalField(decimal_places=2, default=0, max_digits=5)),
+                ('other_metrics', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('strategy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='performances', to='trading.strategy')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Order',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount_in', models.DecimalField(decimal_places=8, max_digits=30)),
+                ('price_limit', models.DecimalField(blank=True, decimal_places=8, max_digits=20, null=True)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('FILLED', 'Filled'), ('CANCELLED', 'Cancelled'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('order_type', models.CharField(choices=[('MARKET', 'Market'), ('LIMIT', 'Limit')], default='MARKET', max_length=20)),
+                ('is_paper_trade', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('strategy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='orders', to='trading.strategy')),
+                ('token_in', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='orders_in', to='trading.token')),
+                ('token_out', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='orders_out', to='trading.token')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Trade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tx_hash', models.CharField(blank=True, max_length=100, null=True)),
+                ('price_executed', models.DecimalField(blank=True, decimal_places=8, max_digits=20, null=True)),
+                ('amount_out', models.DecimalField(blank=True, decimal_places=8, max_digits=30, null=True)),
+                ('execution_timestamp', models.DateTimeField(auto_now_add=True)),
+                ('gas_used', models.DecimalField(blank=True, decimal_places=8, max_digits=30, null=True)),
+                ('gas_price', models.DecimalField(blank=True, decimal_places=8, max_digits=20, null=True)),
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='trade', to='trading.order')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Wallet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('network', models.CharField(choices=[('ethereum', 'Ethereum Mainnet'), ('arbitrum', 'Arbitrum'), ('optimism', 'Optimism'), ('polygon', 'Polygon'), ('base', 'Base')], max_length=50)),
+                ('address', models.CharField(max_length=100)),
+                ('private_key_encrypted', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='wallet',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='trading.wallet'),
+        ),
+        migrations.CreateModel(
+            name='BridgeTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_network', models.CharField(choices=[('ethereum', 'Ethereum Mainnet'), ('arbitrum', 'Arbitrum'), ('optimism', 'Optimism'), ('polygon', 'Polygon')], max_length=50)),
+                ('to_network', models.CharField(choices=[('ethereum', 'Ethereum Mainnet'), ('arbitrum', 'Arbitrum'), ('optimism', 'Optimism'), ('polygon', 'Polygon')], max_length=50)),
+                ('amount', models.DecimalField(decimal_places=8, max_digits=30)),
+                ('bridge_tx_hash', models.CharField(blank=True, max_length=100, null=True)),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('status', models.CharField(choices=[('INITIATED', 'Initiated'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='INITIATED', max_length=20)),
+                ('strategy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bridge_txs', to='trading.strategy')),
+                ('token', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='trading.token')),
+                ('wallet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='trading.wallet')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PriceFeed',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField()),
+                ('open', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('high', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('low', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('close', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('volume', models.DecimalField(decimal_places=8, default=0, max_digits=30)),
+                ('source', models.CharField(choices=[('uniswap_v3', 'Uniswap V3'), ('1inch', '1inch Aggregator'), ('chainlink', 'Chainlink Oracle'), ('paraswap', 'ParaSwap')], default='uniswap_v3', max_length=50)),
+                ('token', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_feeds', to='trading.token')),
+            ],
+            options={
+                'unique_together': {('token', 'timestamp', 'source')},
+            },
+        ),
+    ]
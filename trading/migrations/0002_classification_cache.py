@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassificationCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('model_version', models.CharField(max_length=100)),
+                ('sector', models.CharField(max_length=50)),
+                ('sentiment', models.CharField(max_length=20)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
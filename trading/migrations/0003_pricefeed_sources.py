@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0002_classification_cache'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pricefeed',
+            name='source',
+            field=models.CharField(choices=[('uniswap_v3', 'Uniswap V3'), ('1inch', '1inch Aggregator'), ('chainlink', 'Chainlink Oracle'), ('paraswap', 'ParaSwap'), ('yfinance', 'Yahoo Finance'), ('import', 'File Import')], default='uniswap_v3', max_length=50),
+        ),
+    ]
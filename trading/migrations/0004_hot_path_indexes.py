@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0003_pricefeed_sources'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='optiontrade',
+            index=models.Index(condition=models.Q(('exit_price__isnull', True)), fields=['ticker', 'expiry'], name='optiontrade_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['timestamp'], name='post_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['sector', 'timestamp'], name='post_sector_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pricefeed',
+            index=models.Index(fields=['token', 'source', 'timestamp'], name='pricefeed_tok_src_ts_idx'),
+        ),
+    ]
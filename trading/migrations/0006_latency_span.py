@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0005_ingestion_cursor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatencySpan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(max_length=32)),
+                ('seconds', models.FloatField()),
+                ('recorded_at', models.DateTimeField(auto_now_add=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='latency_spans', to='trading.post')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['stage', 'recorded_at'], name='latencyspan_stage_ts_idx')],
+            },
+        ),
+    ]
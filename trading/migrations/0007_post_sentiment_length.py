@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0006_latency_span'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='sentiment',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+    ]
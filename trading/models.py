@@ -1,4 +1,8 @@
-from django.db import models
+import numpy as np
+import pandas as pd
+from django.db import connections, models
+from django.db.models import FloatField
+from django.db.models.functions import Cast
 from django.contrib.auth.models import User
 
 
@@ -69,6 +73,48 @@ class Token(models.Model):
         return f"{self.symbol} ({self.network})"
 
 
+class PriceFeedQuerySet(models.QuerySet):
+    """Columnar read path for PriceFeed: no model instances, no per-row Decimals."""
+    OHLCV = ('open', 'high', 'low', 'close', 'volume')
+
+    def for_token(self, token, start=None, end=None, source=None):
+        """Bars for a Token (instance, pk or symbol) in [start, end], oldest first."""
+        if isinstance(token, str):
+            qs = self.filter(token__symbol=token)
+        else:
+            qs = self.filter(token=token)
+        if start is not None:
+            qs = qs.filter(timestamp__gte=start)
+        if end is not None:
+            qs = qs.filter(timestamp__lte=end)
+        if source:
+            qs = qs.filter(source=source)
+        return qs.order_by('timestamp')
+
+    def _fetch_columns(self, token, start, end, source):
+        qs = self.for_token(token, start, end, source) if token is not None else self.order_by('timestamp')
+        # cast in SQL and read the raw cursor, skipping Django's per-row Decimal/datetime converters
+        casts = {f'{col}_f': Cast(col, FloatField()) for col in self.OHLCV}
+        sql, params = qs.annotate(**casts).values_list('timestamp', *casts).query.sql_with_params()
+        with connections[qs.db].cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        frame = pd.DataFrame.from_records(rows, columns=('timestamp',) + self.OHLCV)
+        frame['timestamp'] = pd.to_datetime(frame['timestamp'], utc=True, format='ISO8601')
+        return frame.astype({col: 'float64' for col in self.OHLCV})
+
+    def as_frame(self, token=None, start=None, end=None, source=None) -> pd.DataFrame:
+        """OHLCV as a float64 DataFrame indexed by UTC timestamp."""
+        return self._fetch_columns(token, start, end, source).set_index('timestamp')
+
+    def as_arrays(self, token=None, start=None, end=None, source=None) -> dict:
+        """OHLCV as float64 NumPy arrays plus 'timestamp' as int64 nanoseconds since the epoch."""
+        frame = self._fetch_columns(token, start, end, source)
+        arrays = {col: frame[col].to_numpy() for col in self.OHLCV}
+        arrays['timestamp'] = frame['timestamp'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        return arrays
+
+
 # 5. PriceFeed Model (Historical OHLCV data)
 class PriceFeed(models.Model):
     SOURCE_CHOICES = [
@@ -76,6 +122,8 @@ class PriceFeed(models.Model):
         ("1inch", "1inch Aggregator"),
         ("chainlink", "Chainlink Oracle"),
         ("paraswap", "ParaSwap"),
+        ("yfinance", "Yahoo Finance"),
+        ("import", "File Import"),
         # etc.
     ]
 
@@ -88,8 +136,14 @@ class PriceFeed(models.Model):
     volume = models.DecimalField(max_digits=30, decimal_places=8, default=0)
     source = models.CharField(max_length=50, choices=SOURCE_CHOICES, default="uniswap_v3")
 
+    objects = PriceFeedQuerySet.as_manager()
+
     class Meta:
         unique_together = ("token", "timestamp", "source")
+        indexes = [
+            # range scans: PriceFeed.objects.for_token(token, start, end, source)
+            models.Index(fields=["token", "source", "timestamp"], name="pricefeed_tok_src_ts_idx"),
+        ]
 
     def __str__(self):
         return f"{self.token.symbol} at {self.timestamp}"
@@ -102,12 +156,73 @@ class Post(models.Model):
     timestamp = models.DateTimeField()
     inserted_at = models.DateTimeField(auto_now_add=True)
     sector = models.CharField(max_length=50, default="none")
-    sentiment = models.CharField(max_length=10, blank=True, default="")
+    sentiment = models.CharField(max_length=20, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            # time-ordered replays / exports and per-sector lookups
+            models.Index(fields=["timestamp"], name="post_timestamp_idx"),
+            models.Index(fields=["sector", "timestamp"], name="post_sector_ts_idx"),
+        ]
 
     def __str__(self):
         return f"Post {self.tweet_id} by {self.user_handle}"
 
 
+class ClassificationCacheEntry(models.Model):
+    """Cached NLP classification keyed on normalized post text + model/prompt version."""
+    key = models.CharField(max_length=64, unique=True)  # sha256 hex digest
+    model_version = models.CharField(max_length=100)
+    sector = models.CharField(max_length=50)
+    sentiment = models.CharField(max_length=20)
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.key[:12]} -> {self.sector}/{self.sentiment} ({self.model_version})"
+
+
+class IngestionCursorQuerySet(models.QuerySet):
+    def advance(self, handle, status_id):
+        """Move handle's since_id forward to status_id, never backwards. Call inside the post's transaction."""
+        cursor, _ = self.select_for_update().get_or_create(handle=handle)
+        # status ids are numeric strings: compare by length first so '10' > '9'
+        if (len(status_id), status_id) > (len(cursor.since_id), cursor.since_id):
+            cursor.since_id = status_id
+            cursor.save(update_fields=['since_id', 'updated_at'])
+        return cursor
+
+
+class IngestionCursor(models.Model):
+    """Newest processed status id per Truth Social handle, so polling resumes with since_id after a restart."""
+    handle = models.CharField(max_length=100, unique=True)
+    since_id = models.CharField(max_length=50, blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = IngestionCursorQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.handle} since {self.since_id or '-'}"
+
+
+class LatencySpan(models.Model):
+    """Seconds a post spent in one pipeline stage (see trading.latency for the stages)."""
+    post = models.ForeignKey('Post', on_delete=models.CASCADE, related_name="latency_spans")
+    stage = models.CharField(max_length=32)
+    seconds = models.FloatField()
+    recorded_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # latency_report: per-stage percentiles over a time window
+            models.Index(fields=["stage", "recorded_at"], name="latencyspan_stage_ts_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.stage} {self.seconds * 1000:.1f}ms for Post {self.post_id}"
+
+
 class SentimentScore(models.Model):
     tweet = models.ForeignKey('Post', on_delete=models.CASCADE, related_name="sentiment_scores")
     sentiment_value = models.FloatField()  # e.g. -1 to 1
@@ -130,6 +245,15 @@ class OptionTrade(models.Model):
     entry_timestamp = models.DateTimeField(auto_now_add=True)
     exit_timestamp = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # close_positions sweeps: open trades only, grouped by (ticker, expiry)
+            models.Index(
+                fields=["ticker", "expiry"], name="optiontrade_open_idx",
+                condition=models.Q(exit_price__isnull=True),
+            ),
+        ]
+
     def __str__(self):
         return f"{self.option_type} {self.ticker} @{self.strike} exp {self.expiry}"
     @property
@@ -0,0 +1,123 @@
+"""
+Offline NLP backends (NLP_SERVICE_CLASS) for tests and load testing without the network.
+
+LexiconNLPService classifies with word lists; ReplayNLPService serves recorded
+answers with simulated per-request latency.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+from .injestion import NLPBackend
+from .text import normalize_text, tokenize
+
+log = logging.getLogger(__name__)
+
+SECTOR_TERMS = {
+    'defense': {'military', 'defense', 'army', 'navy', 'war', 'missile', 'missiles', 'weapons', 'nato', 'pentagon', 'troops'},
+    'energy': {'oil', 'gas', 'drill', 'drilling', 'energy', 'pipeline', 'opec', 'coal', 'nuclear', 'lng', 'gasoline'},
+    'healthcare': {'health', 'healthcare', 'drug', 'drugs', 'pharma', 'medicare', 'medicaid', 'vaccine', 'hospital', 'hospitals'},
+    'technology': {'tech', 'technology', 'chip', 'chips', 'semiconductor', 'semiconductors', 'apple', 'google', 'microsoft', 'ai'},
+    'finance': {'bank', 'banks', 'banking', 'fed', 'rates', 'interest', 'dollar', 'crypto', 'bitcoin', 'stocks', 'market'},
+    'industrials': {'steel', 'aluminum', 'factory', 'factories', 'manufacturing', 'tariff', 'tariffs', 'infrastructure', 'autos'},
+}
+POSITIVE = {
+    'great', 'boom', 'booming', 'record', 'win', 'winning', 'strong', 'surge', 'deal', 'best', 'growth', 'jobs',
+    'approve', 'approved', 'invest', 'investment', 'build', 'building', 'up', 'lower', 'cheap', 'support', 'success',
+}
+NEGATIVE = {
+    'ban', 'sanction', 'sanctions', 'crash', 'disaster', 'terrible', 'weak', 'cut', 'cuts', 'attack', 'penalty',
+    'investigate', 'fraud', 'failing', 'bad', 'worst', 'tax', 'taxes', 'tariff', 'tariffs', 'shutdown', 'down', 'stop',
+}
+INTENSIFIERS = {'very', 'massive', 'huge', 'tremendous', 'biggest', 'record', 'immediately', 'totally', 'historic'}
+
+
+class LexiconNLPService(NLPBackend):
+    """Deterministic rule-based classifier: sector by term hits, sentiment by polarity counts and intensifiers."""
+
+    @classmethod
+    def process_post(cls, post_text: str) -> tuple[str, str]:
+        tokens = tokenize(post_text)
+        hits = {sector: len(tokens & terms) for sector, terms in SECTOR_TERMS.items()}
+        sector = max(hits, key=hits.get)
+        if not hits[sector]:
+            return 'none', 'neutral'
+        polarity = len(tokens & POSITIVE) - len(tokens & NEGATIVE)
+        strong = abs(polarity) >= 2 or (polarity and tokens & INTENSIFIERS)
+        if polarity > 0:
+            return sector, 'strongly_bullish' if strong else 'bullish'
+        if polarity < 0:
+            return sector, 'strongly_bearish' if strong else 'bearish'
+        return sector, 'neutral'
+
+
+class ReplayNLPService(NLPBackend):
+    """
+    Serves recorded (sector, sentiment) answers keyed by normalized post text,
+    sleeping NLP_REPLAY_LATENCY (+/- NLP_REPLAY_JITTER) seconds per request to
+    stand in for the API. Recordings come from NLP_REPLAY_PATH, an NDJSON file
+    of {"text", "sector", "sentiment"} objects such as /exports/posts.ndjson,
+    or from classified Post rows when unset. Unrecorded posts fall back to the
+    lexicon model.
+    """
+    fallback = LexiconNLPService
+    _responses = None
+    _lock = threading.Lock()
+    # seeded so replayed latencies are the same run to run
+    _rng = random.Random(0)
+
+    @classmethod
+    def responses(cls) -> dict:
+        with cls._lock:
+            if cls._responses is None:
+                cls._responses = cls.load(getattr(settings, 'NLP_REPLAY_PATH', None))
+            return cls._responses
+
+    @classmethod
+    def load(cls, path=None) -> dict:
+        if path:
+            rows = (json.loads(line) for line in Path(path).read_text().splitlines() if line.strip())
+            rows = ((r['text'], r['sector'], r['sentiment']) for r in rows)
+        else:
+            from .models import Post
+            rows = Post.objects.exclude(sentiment='').values_list('text', 'sector', 'sentiment')
+        responses = {normalize_text(text): (sector, sentiment) for text, sector, sentiment in rows}
+        log.info("Loaded %d recorded classifications", len(responses))
+        return responses
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._responses = None
+
+    @classmethod
+    def _wait(cls):
+        latency = getattr(settings, 'NLP_REPLAY_LATENCY', 0.3)
+        jitter = getattr(settings, 'NLP_REPLAY_JITTER', 0.0)
+        with cls._lock:
+            delay = latency + cls._rng.uniform(-jitter, jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    @classmethod
+    def _lookup(cls, text: str) -> tuple[str, str]:
+        return cls.responses().get(normalize_text(text)) or cls.fallback.process_post(text)
+
+    @classmethod
+    def process_post(cls, post_text: str) -> tuple[str, str]:
+        cls._wait()
+        return cls._lookup(post_text)
+
+    @classmethod
+    def classify_batch(cls, texts: list[str]) -> list[tuple[str, str]]:
+        # one simulated round-trip per NLP_BATCH_SIZE chunk, like NLPService.classify_batch
+        texts = list(texts)
+        batch_size = max(1, getattr(settings, 'NLP_BATCH_SIZE', 10))
+        for _ in range(0, len(texts), batch_size):
+            cls._wait()
+        return [cls._lookup(text) for text in texts]
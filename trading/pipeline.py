@@ -0,0 +1,147 @@
+"""
+Post-processing pipeline: classify, price and persist ingested posts.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import latency
+from .execution import STRONG_SENTIMENTS, UNCLASSIFIED, Simulator, decide_trade
+from .metrics import POSTS_INGESTED, POSTS_SKIPPED
+from .models import IngestionCursor, Post
+
+
+class PostPipeline:
+    """
+    Run ingested posts through classification, trade pricing and persistence.
+
+    Trade pricing is network-bound and runs on a bounded thread pool when
+    concurrency > 1. Classification stays on the calling thread (batched when
+    the backend supports it) because it may read and write the DB-backed
+    classification cache. Database writes also stay on the calling thread and
+    happen strictly in post order, so trades are recorded in the order their
+    posts arrived.
+
+    Posts already stored are skipped before classification (one query per batch),
+    and each post's ingestion cursor is checkpointed in the same transaction that
+    stores it, so a restart neither loses nor re-classifies posts. An optional
+    pre-filter (trading.prefilter) stores unlikely-actionable posts unclassified.
+    """
+    def __init__(self, nlp_cls, simulator: Simulator | None = None, concurrency: int = 1, prefilter=None):
+        self.nlp_cls = nlp_cls
+        self.simulator = simulator or Simulator()
+        self.prefilter = prefilter
+        self.concurrency = max(1, int(concurrency))
+        self.skipped = 0
+
+    def classify_batch(self, posts: list) -> list | None:
+        """Classify several posts in one request when the NLP backend supports it, else None."""
+        classify_batch = getattr(self.nlp_cls, 'classify_batch', None)
+        if classify_batch is None or len(posts) < 2:
+            return None
+        return classify_batch([status.text for status in posts])
+
+    def label(self, posts: list) -> list:
+        """Pre-filter and batch-classify posts; None entries are left for classify()."""
+        labels = [None] * len(posts)
+        if self.prefilter is not None:
+            labels = [None if self.prefilter.relevant(status.text) else UNCLASSIFIED for status in posts]
+            POSTS_SKIPPED.inc(labels.count(UNCLASSIFIED), reason='prefilter')
+        pending = [i for i, label in enumerate(labels) if label is None]
+        with latency.collect() as spans:
+            batch = self.classify_batch([posts[i] for i in pending])
+        if batch:
+            # each post is charged an equal share of the batched request time
+            shares = [(stage, seconds / len(pending)) for stage, seconds in spans]
+            for i, label in zip(pending, batch):
+                labels[i] = label
+                posts[i].spans = list(getattr(posts[i], 'spans', ())) + shares
+        return labels
+
+    def classify(self, status) -> tuple[str, str]:
+        """Classify one post on the calling thread, adding its spans to the post's."""
+        with latency.collect() as spans:
+            label = self.nlp_cls.process_post(status.text)
+        status.spans = list(getattr(status, 'spans', ())) + spans
+        return label
+
+    def prepare(self, status, label: tuple[str, str] | None = None) -> SimpleNamespace:
+        """
+        Classify a post (unless already labelled) and, for strong signals, price the trade.
+        Pricing only reads market data, so labelled posts can be prepared on worker threads.
+        """
+        sector, sentiment = label or self.classify(status)
+        strong = sentiment in STRONG_SENTIMENTS
+        # spans recorded here (quotes) join those from ingestion and classification
+        with latency.collect(list(getattr(status, 'spans', ()))) as spans:
+            trade_info = decide_trade(sector, sentiment) if strong else None
+        return SimpleNamespace(
+            status=status, sector=sector, sentiment=sentiment,
+            strong=strong, trade_info=trade_info, spans=spans,
+        )
+
+    def known_ids(self, posts: list) -> set:
+        """tweet_ids among posts that are already stored."""
+        return set(Post.objects.filter(tweet_id__in=[status.id for status in posts]).values_list('tweet_id', flat=True))
+
+    @staticmethod
+    def checkpoint(status):
+        # statuses from TruthClient carry the handle whose cursor they advance
+        source = getattr(status, 'source', None)
+        if source:
+            IngestionCursor.objects.advance(source, status.id)
+
+    def persist(self, prepared: SimpleNamespace) -> SimpleNamespace:
+        """Write the post, any priced trade and the cursor checkpoint atomically; sets post/trade on the result."""
+        status = prepared.status
+        spans = getattr(prepared, 'spans', [])
+        with transaction.atomic():
+            with latency.collect(spans), latency.span('db_persist'):
+                post, _ = Post.objects.get_or_create(
+                    tweet_id=status.id,
+                    defaults={
+                        'user_handle': getattr(status, 'user_handle', ''),
+                        'text': status.text,
+                        'timestamp': getattr(status, 'created_at', timezone.now()),
+                        'sector': prepared.sector,
+                        'sentiment': prepared.sentiment,
+                    }
+                )
+                prepared.post = post
+                prepared.trade = None
+                if prepared.strong and prepared.trade_info:
+                    prepared.trade = self.simulator.create_trade(post, info=prepared.trade_info)
+                self.checkpoint(status)
+            latency.save(post, spans, status, traded=prepared.trade is not None)
+        return prepared
+
+    def run(self, posts):
+        """Yield persisted results for new posts, in the order the posts were given."""
+        # drop repeats within the batch, then anything stored by an earlier run
+        posts = list({status.id: status for status in posts}.values())
+        POSTS_INGESTED.inc(len(posts))
+        known = self.known_ids(posts) if posts else set()
+        todo = [status for status in posts if status.id not in known]
+        labels = self.label(todo)
+        if self.concurrency == 1 or len(todo) < 2:
+            prepared = (self.prepare(status, label) for status, label in zip(todo, labels))
+            yield from self._persist_in_order(posts, known, prepared)
+            return
+        # workers only price trades; classification may touch the DB, so it runs here first
+        labels = [label or self.classify(status) for status, label in zip(todo, labels)]
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = [pool.submit(self.prepare, status, label) for status, label in zip(todo, labels)]
+            # consume in submission order: post N is written once it and all earlier posts are ready
+            yield from self._persist_in_order(posts, known, (future.result() for future in futures))
+
+    def _persist_in_order(self, posts, known, prepared):
+        for status in posts:
+            if status.id in known:
+                self.skipped += 1
+                POSTS_SKIPPED.inc(reason='known')
+                with transaction.atomic():
+                    self.checkpoint(status)
+            else:
+                yield self.persist(next(prepared))
@@ -0,0 +1,72 @@
+"""
+Queries behind the positions dashboard: filtering, per-row P/L and a cached summary.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, ExpressionWrapper, F, FloatField, Q, Sum
+from django.db.models.functions import NullIf
+
+from .models import OptionTrade
+
+# P/L % of a closed trade, computed in the database (NULL while open or if entry_price is 0)
+PL_PCT = ExpressionWrapper(
+    (F('exit_price') - F('entry_price')) * 100 / NullIf(F('entry_price'), 0),
+    output_field=FloatField(),
+)
+CLOSED = Q(exit_price__isnull=False)
+
+GENERATION_KEY = 'pnl_summary:generation'
+FILTERS = ('sector', 'ticker', 'status')
+
+
+def clean_filters(params) -> dict:
+    """Supported filters from a QueryDict/dict, empty values dropped."""
+    filters = {key: (params.get(key) or '').strip() for key in FILTERS}
+    if filters['status'] not in ('open', 'closed'):
+        filters['status'] = ''
+    return {key: value for key, value in filters.items() if value}
+
+
+def filter_trades(filters: dict):
+    trades = OptionTrade.objects.all()
+    if filters.get('sector'):
+        trades = trades.filter(post__sector=filters['sector'])
+    if filters.get('ticker'):
+        trades = trades.filter(ticker__iexact=filters['ticker'])
+    if filters.get('status') == 'open':
+        trades = trades.filter(exit_price__isnull=True)
+    elif filters.get('status') == 'closed':
+        trades = trades.filter(CLOSED)
+    return trades
+
+
+def _generation() -> int:
+    # bumping the generation invalidates every cached summary (all filter combinations) at once
+    return cache.get_or_set(GENERATION_KEY, time.time_ns, None)
+
+
+def invalidate_pnl_summary():
+    """Call whenever a trade is opened or closed (signals cover save/delete; bulk_update must call this)."""
+    cache.set(GENERATION_KEY, time.time_ns(), None)
+
+
+def pnl_summary(filters: dict | None = None) -> dict:
+    """Aggregate P/L over the filtered trades, computed by the database and cached until invalidated."""
+    filters = filters or {}
+    key = 'pnl_summary:{}:{}'.format(_generation(), ':'.join(f"{k}={filters.get(k, '')}" for k in FILTERS))
+    summary = cache.get(key)
+    if summary is None:
+        summary = filter_trades(filters).aggregate(
+            total=Count('id'),
+            open=Count('id', filter=Q(exit_price__isnull=True)),
+            closed=Count('id', filter=CLOSED),
+            wins=Count('id', filter=Q(exit_price__gt=F('entry_price'))),
+            invested=Sum('entry_price'),
+            realized=Sum(F('exit_price') - F('entry_price'), filter=CLOSED),
+            avg_pl_pct=Avg(PL_PCT, filter=CLOSED),
+        )
+        summary['win_rate'] = summary['wins'] * 100 / summary['closed'] if summary['closed'] else None
+        cache.set(key, summary, getattr(settings, 'PNL_SUMMARY_TTL', 300))
+    return summary
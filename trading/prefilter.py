@@ -0,0 +1,121 @@
+"""
+Cheap local relevance gate in front of the LLM classifier.
+
+A naive Bayes model over post tokens, trained on posts the LLM has already
+labelled, estimates how likely a post is to be actionable (strong sentiment).
+Posts scoring below PREFILTER_THRESHOLD are stored as unclassified without an
+LLM call. Until a model has been trained, a market keyword list decides.
+"""
+import json
+import logging
+import math
+from pathlib import Path
+
+from django.conf import settings
+
+from .execution import STRONG_SENTIMENTS
+from .text import tokenize
+
+log = logging.getLogger(__name__)
+
+# Fallback for an untrained filter: any of these makes a post worth classifying
+KEYWORDS = frozenset("""
+    tariff tariffs trade deal deals china economy economic market markets stock stocks dow nasdaq
+    inflation fed rates interest dollar tax taxes jobs manufacturing factory factories steel
+    oil gas drill drilling energy pipeline opec coal nuclear
+    military defense army navy war missile missiles weapons nato pentagon
+    health healthcare drug drugs pharma medicare medicaid vaccine hospital hospitals
+    tech technology chip chips semiconductor apple google microsoft ai
+    bank banks banking crypto bitcoin
+""".split())
+
+
+class RelevanceFilter:
+    """
+    Bernoulli-style naive Bayes reduced to a bias plus one log-odds weight per
+    token, so scoring a post is a handful of dict lookups.
+    """
+
+    def __init__(self, weights: dict | None = None, bias: float = 0.0, threshold: float | None = None):
+        self.weights = weights or {}
+        self.bias = bias
+        self.threshold = threshold if threshold is not None else getattr(settings, 'PREFILTER_THRESHOLD', 0.2)
+        self.passed = 0
+        self.skipped = 0
+
+    @property
+    def trained(self) -> bool:
+        return bool(self.weights)
+
+    @classmethod
+    def fit(cls, texts, labels, threshold=None, min_count: int = 2, alpha: float = 1.0):
+        """Train on texts with boolean labels (True = actionable)."""
+        counts = {True: {}, False: {}}
+        totals = {True: 0, False: 0}
+        for text, label in zip(texts, labels):
+            label = bool(label)
+            totals[label] += 1
+            for token in tokenize(text):
+                counts[label][token] = counts[label].get(token, 0) + 1
+        if not totals[True] or not totals[False]:
+            raise ValueError('Need both actionable and non-actionable examples to train')
+        vocab = {t for t in counts[True].keys() | counts[False].keys()
+                 if counts[True].get(t, 0) + counts[False].get(t, 0) >= min_count}
+        weights = {}
+        for token in vocab:
+            p_rel = (counts[True].get(token, 0) + alpha) / (totals[True] + 2 * alpha)
+            p_irr = (counts[False].get(token, 0) + alpha) / (totals[False] + 2 * alpha)
+            weights[token] = math.log(p_rel / p_irr)
+        bias = math.log(totals[True] / totals[False])
+        return cls(weights, bias, threshold)
+
+    def score(self, text: str) -> float:
+        """Estimated probability that the post is actionable."""
+        tokens = tokenize(text)
+        if not self.trained:
+            return 1.0 if tokens & KEYWORDS else 0.0
+        logit = self.bias + sum(self.weights.get(token, 0.0) for token in tokens)
+        # clamp so exp() cannot overflow on long posts
+        return 1.0 / (1.0 + math.exp(-max(-50.0, min(50.0, logit))))
+
+    def relevant(self, text: str) -> bool:
+        """Gate decision; counts passed/skipped posts."""
+        keep = self.score(text) >= self.threshold
+        if keep:
+            self.passed += 1
+        else:
+            self.skipped += 1
+        return keep
+
+    def stats(self) -> dict:
+        return {'passed': self.passed, 'skipped': self.skipped}
+
+    def to_dict(self) -> dict:
+        return {'bias': self.bias, 'weights': self.weights}
+
+    def save(self, path):
+        Path(path).write_text(json.dumps(self.to_dict()))
+
+    @classmethod
+    def load(cls, path, threshold=None):
+        data = json.loads(Path(path).read_text())
+        return cls(data['weights'], data['bias'], threshold)
+
+
+def training_data(posts=None):
+    """(texts, labels) from LLM-classified posts; posts the filter skipped (blank sentiment) are excluded."""
+    from .models import Post
+    posts = Post.objects.exclude(sentiment='') if posts is None else posts
+    rows = list(posts.values_list('text', 'sentiment'))
+    return [text for text, _ in rows], [sentiment in STRONG_SENTIMENTS for _, sentiment in rows]
+
+
+def load_prefilter() -> RelevanceFilter | None:
+    """The configured filter, or None when PREFILTER_ENABLED is off."""
+    if not getattr(settings, 'PREFILTER_ENABLED', False):
+        return None
+    path = getattr(settings, 'PREFILTER_MODEL_PATH', None)
+    if path and Path(path).is_file():
+        return RelevanceFilter.load(path)
+    log.warning("No trained pre-filter at %s; gating on market keywords (run train_prefilter)", path)
+    return RelevanceFilter()
@@ -0,0 +1,55 @@
+"""
+Adaptive poll interval for run_bot: poll fast right after activity or while the
+US market is open, back off geometrically while the account is quiet.
+"""
+import datetime as dt
+import time
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+
+MARKET_TZ = ZoneInfo('America/New_York')
+MARKET_OPEN = dt.time(9, 30)
+MARKET_CLOSE = dt.time(16, 0)
+
+
+def market_open(now: dt.datetime | None = None) -> bool:
+    """True during regular NYSE hours (Mon-Fri 9:30-16:00 ET; holidays not considered)."""
+    now = (now or dt.datetime.now(dt.timezone.utc)).astimezone(MARKET_TZ)
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+
+class PollScheduler:
+    """
+    Delay before the next poll:
+      * POLL_INTERVAL_MIN while posts arrived within the last POLL_ACTIVE_WINDOW seconds,
+      * otherwise POLL_INTERVAL grown by POLL_BACKOFF per empty poll, up to POLL_INTERVAL_MAX,
+      * never more than POLL_INTERVAL_MARKET while the market is open.
+    """
+
+    def __init__(self, base=None, fastest=None, slowest=None, backoff=None, active_window=None, market_cap=None):
+        self.base = base if base is not None else getattr(settings, 'POLL_INTERVAL', 60)
+        self.fastest = fastest if fastest is not None else getattr(settings, 'POLL_INTERVAL_MIN', 10)
+        self.slowest = slowest if slowest is not None else getattr(settings, 'POLL_INTERVAL_MAX', 600)
+        self.backoff = backoff if backoff is not None else getattr(settings, 'POLL_BACKOFF', 1.5)
+        self.active_window = active_window if active_window is not None else getattr(settings, 'POLL_ACTIVE_WINDOW', 900)
+        self.market_cap = market_cap if market_cap is not None else getattr(settings, 'POLL_INTERVAL_MARKET', 30)
+        self.quiet_polls = 0
+        self.last_activity = None  # time.monotonic() of the last poll that returned posts
+
+    def record(self, num_posts: int, now: float | None = None):
+        """Feed back the result of a poll."""
+        if num_posts:
+            self.quiet_polls = 0
+            self.last_activity = time.monotonic() if now is None else now
+        else:
+            self.quiet_polls += 1
+
+    def next_delay(self, now: float | None = None, wall: dt.datetime | None = None) -> float:
+        now = time.monotonic() if now is None else now
+        if self.last_activity is not None and now - self.last_activity < self.active_window:
+            return self.fastest
+        delay = min(self.base * self.backoff ** self.quiet_polls, self.slowest)
+        if market_open(wall):
+            delay = min(delay, self.market_cap)
+        return max(delay, self.fastest)
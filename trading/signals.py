@@ -0,0 +1,17 @@
+"""
+Signal handlers for the trading app.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import OptionTrade
+from .positions import invalidate_pnl_summary
+
+
+@receiver(post_save, sender=OptionTrade)
+@receiver(post_delete, sender=OptionTrade)
+def trade_changed(sender, **kwargs):
+    """A trade was opened, closed or removed: cached P/L summaries are stale once the write commits."""
+    # invalidating before commit lets a concurrent request re-cache the old rows
+    transaction.on_commit(invalidate_pnl_summary)
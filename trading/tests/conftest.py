@@ -0,0 +1,22 @@
+import pytest
+
+from trading import market_data
+
+
+@pytest.fixture(autouse=True)
+def clear_market_data_cache():
+    """Quotes/chains are cached per process; tests stub yfinance differently, so start each one cold."""
+    market_data.clear_cache()
+    yield
+    market_data.clear_cache()
+
+
+@pytest.fixture(autouse=True)
+def django_cache(settings, tmp_path):
+    """A fresh file cache per test, so cached P/L summaries never outlive rolled-back rows or touch BASE_DIR/.cache."""
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path / 'cache'),
+        }
+    }
@@ -0,0 +1,57 @@
+"""
+Local stand-in for the Truth Social streaming API, so streaming ingestion can be tested offline.
+"""
+import json
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeTruthStream:
+    """
+    Serves server-sent events on http://127.0.0.1:<port>/api/v1/streaming/user.
+
+    Each call to push() sends one 'update' event to the connected client;
+    drop() ends the current connection so the client has to reconnect.
+    """
+    def __init__(self):
+        self.events = queue.Queue()
+        self.connections = 0
+        self.auth_headers = []
+        stream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stream.connections += 1
+                stream.auth_headers.append(self.headers.get('Authorization'))
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.end_headers()
+                self.wfile.write(b':thump\n\n')
+                self.wfile.flush()
+                while True:
+                    event = stream.events.get()
+                    if event is None:
+                        return
+                    self.wfile.write(event)
+                    self.wfile.flush()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_port}/api/v1/streaming/user'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def push(self, id, text, acct='testuser', created_at='2025-04-21T12:00:00Z'):
+        status = {'id': id, 'content': text, 'created_at': created_at, 'account': {'acct': acct}}
+        self.events.put(f'event: update\ndata: {json.dumps(status)}\n\n'.encode())
+
+    def drop(self):
+        self.events.put(None)
+
+    def close(self):
+        self.drop()
+        self.server.shutdown()
+        self.server.server_close()
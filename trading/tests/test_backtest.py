@@ -0,0 +1,111 @@
+import datetime
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+
+from trading import backtest
+from trading.models import Post, PriceFeed, Strategy, StrategyPerformance, Token
+
+UTC = datetime.timezone.utc
+
+
+def make_bars(symbol, closes, start=datetime.datetime(2025, 4, 7, 20, 0, tzinfo=UTC)):
+    token = Token.objects.create(symbol=symbol, address='', network='ethereum')
+    for i, close in enumerate(closes):
+        PriceFeed.objects.create(
+            token=token, timestamp=start + datetime.timedelta(days=i),
+            open=close, high=close, low=close, close=close, volume=0,
+        )
+    return token
+
+
+@pytest.fixture
+def history(db):
+    # Mon 2025-04-07 .. Sun 2025-04-20, daily closes
+    make_bars('XLE', [100, 101, 104, 108, 109, 109, 109, 95, 94, 93, 92, 91, 91, 91])
+    make_bars('XLF', [50] * 14)
+    Post.objects.create(tweet_id='1', user_handle='u', text='oil', sector='energy',
+                        sentiment='strongly_bullish', timestamp=datetime.datetime(2025, 4, 7, 15, 0, tzinfo=UTC))
+    Post.objects.create(tweet_id='2', user_handle='u', text='banks', sector='finance',
+                        sentiment='strongly_bearish', timestamp=datetime.datetime(2025, 4, 7, 16, 0, tzinfo=UTC))
+    Post.objects.create(tweet_id='3', user_handle='u', text='meh', sector='energy',
+                        sentiment='bullish', timestamp=datetime.datetime(2025, 4, 8, 15, 0, tzinfo=UTC))
+
+
+def test_run_backtest_prices_from_pricefeed(history):
+    params = backtest.build_params({'profit_target': 0.5})
+    data = backtest.load_data(params['sector_ticker'].values())
+    trades = backtest.run_backtest(data, params)['trades'].set_index('ticker')
+    # weak 'bullish' post does not trade
+    assert sorted(trades.index) == ['XLE', 'XLF']
+    xle = trades.loc['XLE']
+    assert xle['strike'] == 100
+    # CALL struck at 100 gains as XLE rallies and exits before Friday's expiry
+    assert xle['exit_price'] >= xle['entry_price'] * 1.5
+    assert xle['exit_ns'] < backtest._expiry_ns(datetime.datetime(2025, 4, 7, tzinfo=UTC), None)
+    # flat XLF PUT decays to zero at expiry
+    assert trades.loc['XLF', 'exit_price'] == 0
+
+
+def test_backtest_command_saves_performance(history):
+    out = StringIO()
+    call_command('backtest', '--strategy', 'replay', '--profit_target', '0.5', stdout=out)
+    perf = StrategyPerformance.objects.get(strategy__name='replay')
+    assert perf.num_trades == 2
+    assert perf.win_rate == Decimal('50.00')
+    assert perf.other_metrics['params']['profit_target'] == 0.5
+    assert 'Replayed 3 posts' in out.getvalue()
+
+
+def test_backtest_date_only_end_includes_that_day(history):
+    out = StringIO()
+    # post 3 is at 15:00 on the end date
+    call_command('backtest', '--end', '2025-04-08', '--dry-run', stdout=out)
+    assert 'Replayed 3 posts' in out.getvalue()
+    call_command('backtest', '--end', '2025-04-07T23:59', '--dry-run', stdout=out)
+    assert 'Replayed 2 posts' in out.getvalue()
+
+
+def test_backtest_pluggable_decision(history):
+    params = backtest.build_params({'decision': lambda post, params: ('XLF', 'CALL')})
+    data = backtest.load_data(['XLF'])
+    assert backtest.run_backtest(data, params)['metrics']['num_trades'] == 3
+
+
+@pytest.mark.parametrize('workers', ['1', '2'])
+def test_sweep_records_each_combination(history, workers):
+    grid = '{"profit_target": [0.2, 0.5], "sentiments": [["strongly_bullish"], ["strongly_bullish", "strongly_bearish"]]}'
+    out = StringIO()
+    call_command('sweep', grid, '--strategy', 'grid', '--workers', workers, stdout=out)
+    perfs = StrategyPerformance.objects.filter(strategy__name='grid')
+    assert perfs.count() == 4
+    trades = {
+        (p.other_metrics['sweep']['profit_target'], len(p.other_metrics['sweep']['sentiments'])): p.num_trades
+        for p in perfs
+    }
+    assert trades == {(0.2, 1): 1, (0.2, 2): 2, (0.5, 1): 1, (0.5, 2): 2}
+    assert 'Completed 4 backtests' in out.getvalue()
+
+
+@pytest.mark.parametrize('sentiments', ['strongly_bullish', ['strongly_bullish', 'bullishish'], [['bullish']]])
+def test_build_params_rejects_malformed_sentiments(sentiments):
+    with pytest.raises(ValueError):
+        backtest.build_params({'sentiments': sentiments})
+
+
+def test_sweep_rejects_bare_sentiment_strings(history):
+    # a flat list is a grid of single strings, not one list of sentiments
+    grid = '{"sentiments": ["strongly_bullish", "strongly_bearish"]}'
+    with pytest.raises(CommandError, match='Invalid combination'):
+        call_command('sweep', grid, '--strategy', 'grid', '--workers', '1', stdout=StringIO())
+    assert not StrategyPerformance.objects.exists()
+
+
+def test_backtest_rejects_strategy_with_string_sentiments(history):
+    Strategy.objects.create(name='typo', user=User.objects.create(username='bullbot'),
+                            parameters={'sentiments': 'strongly_bullish'})
+    with pytest.raises(CommandError, match='Invalid parameters'):
+        call_command('backtest', '--strategy', 'typo', stdout=StringIO())
@@ -0,0 +1,47 @@
+import json
+from contextlib import contextmanager
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from trading import benchmarks
+from trading.models import OptionTrade, Post
+
+
+@pytest.mark.django_db
+def test_bench_command_writes_json(tmp_path):
+    output = tmp_path / 'bench.json'
+    out = StringIO()
+    # pytest-django already runs this against a test database
+    call_command('bench', output=str(output), posts=20, calls=20, decisions=5, trades=30, rows=[50],
+                 current_db=True, stdout=out)
+    report = json.loads(output.read_text())
+    assert set(report['results']) == {
+        'ingest_parse', 'sector_and_sentiment', 'decide_trade_cold', 'decide_trade_warm',
+        'decide_trade_template', 'create_trade', 'close_positions', 'positions_list_50',
+    }
+    assert report['results']['close_positions']['items'] == 30
+    assert all(r['best_s'] > 0 for r in report['results'].values())
+    # benchmarks roll back their rows
+    assert not Post.objects.exists() and not OptionTrade.objects.exists()
+
+    # a second run compares against the first
+    call_command('bench', 'decide_trade', output=str(tmp_path / 'b.json'), compare=str(output),
+                 decisions=5, current_db=True, stdout=out)
+    assert '%' in out.getvalue().splitlines()[-2]
+
+
+@pytest.mark.django_db
+def test_bench_uses_throwaway_database_by_default(tmp_path, monkeypatch):
+    entered = []
+
+    @contextmanager
+    def fake_throwaway():
+        entered.append(True)
+        yield
+    monkeypatch.setattr(benchmarks, 'throwaway_database', fake_throwaway)
+    output = tmp_path / 'bench.json'
+    call_command('bench', 'decide_trade_warm', output=str(output), decisions=5, stdout=StringIO())
+    assert entered == [True]
+    assert json.loads(output.read_text())['throwaway_database'] is True
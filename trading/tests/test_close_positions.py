@@ -5,6 +5,7 @@ import yfinance as yf
 from django.core.management import call_command
 from django.utils import timezone
 from io import StringIO
+from types import SimpleNamespace
 
 from trading.models import OptionTrade, Post
 
@@ -70,4 +71,46 @@ def test_close_no_trades(tmp_path, capsys):
     out = StringIO()
     call_command('close_positions', stdout=out)
     output = out.getvalue().strip()
-    assert output == 'No open trades to evaluate.'
\ No newline at end of file
+    assert output == 'No open trades to evaluate.'
+
+class CountingChainTicker:
+    chain_calls = 0
+    def __init__(self, symbol):
+        self.symbol = symbol
+    def history(self, period):
+        return pd.DataFrame({'Close': [100.0]})
+    def option_chain(self, expiry):
+        CountingChainTicker.chain_calls += 1
+        df = pd.DataFrame({'strike': [95.0, 100.0, 105.0], 'lastPrice': [6.0, 2.0, 0.5]})
+        return SimpleNamespace(calls=df, puts=df)
+
+
+@pytest.mark.django_db
+def test_close_grouped_by_ticker_and_expiry(monkeypatch):
+    monkeypatch.setattr(yf, 'Ticker', CountingChainTicker)
+    CountingChainTicker.chain_calls = 0
+    post = Post.objects.create(
+        tweet_id='102', user_handle='u', text='t', timestamp=timezone.now(),
+        sector='energy', sentiment='strongly_bullish'
+    )
+    expiry = timezone.now().date()
+    winners = [
+        OptionTrade.objects.create(post=post, ticker='XLE', option_type='CALL', strike=Decimal('95'),
+                                   entry_price=Decimal('4'), expiry=expiry)
+        for _ in range(3)
+    ]
+    loser = OptionTrade.objects.create(post=post, ticker='XLE', option_type='CALL', strike=Decimal('105'),
+                                       entry_price=Decimal('1'), expiry=expiry)
+    # strike 101 is not listed: falls back to intrinsic value on the underlying close (101 - 100)
+    unlisted = OptionTrade.objects.create(post=post, ticker='XLE', option_type='PUT', strike=Decimal('101'),
+                                          entry_price=Decimal('0.5'), expiry=expiry)
+    out = StringIO()
+    call_command('close_positions', '--profit_target', '0.2', stdout=out)
+    assert CountingChainTicker.chain_calls == 1
+    for trade in winners:
+        trade.refresh_from_db()
+        assert trade.exit_price == Decimal('6.00')
+    loser.refresh_from_db()
+    assert loser.exit_price is None
+    unlisted.refresh_from_db()
+    assert unlisted.exit_price == Decimal('1.00')
@@ -0,0 +1,56 @@
+from pathlib import Path
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from bullbot.db import database_config
+from trading.injestion import SENTIMENTS
+from trading.models import Post
+
+
+def test_sqlite_profile_defaults():
+    config = database_config(Path('/srv/bullbot'), env={})
+    assert config['ENGINE'] == 'django.db.backends.sqlite3'
+    assert config['NAME'] == Path('/srv/bullbot/db.sqlite3')
+    assert config['OPTIONS']['timeout'] == 20
+    assert config['OPTIONS']['transaction_mode'] == 'IMMEDIATE'
+    init = config['OPTIONS']['init_command']
+    assert 'PRAGMA journal_mode=WAL;' in init and 'PRAGMA synchronous=NORMAL;' in init
+    assert 'PRAGMA mmap_size=268435456;' in init
+
+
+def test_postgres_profile_persistent_connections():
+    config = database_config(Path('.'), env={'DB_PROFILE': 'postgres', 'POSTGRES_HOST': 'db', 'DB_CONN_MAX_AGE': '60'})
+    assert config['ENGINE'] == 'django.db.backends.postgresql'
+    assert config['HOST'] == 'db'
+    assert config['CONN_MAX_AGE'] == 60
+    assert config['CONN_HEALTH_CHECKS'] is True
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        database_config(Path('.'), env={'DB_PROFILE': 'oracle'})
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != 'sqlite', reason='SQLite pragmas')
+def test_sqlite_pragmas_applied_on_connect():
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous')
+        assert cursor.fetchone()[0] == 1  # NORMAL
+        cursor.execute('PRAGMA busy_timeout')
+        assert cursor.fetchone()[0] == 20000
+
+
+def test_post_sentiment_fits_every_label():
+    # SQLite ignores max_length; Postgres rejects a longer value on insert
+    assert max(map(len, SENTIMENTS)) <= Post._meta.get_field('sentiment').max_length
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != 'postgresql', reason='varchar length is only enforced on Postgres')
+def test_postgres_stores_strong_sentiments():
+    for i, sentiment in enumerate(SENTIMENTS):
+        Post.objects.create(tweet_id=f'len{i}', user_handle='u', text='t', timestamp=timezone.now(), sentiment=sentiment)
+    assert set(Post.objects.values_list('sentiment', flat=True)) == set(SENTIMENTS)
@@ -0,0 +1,31 @@
+import datetime
+
+import pytest
+from django.db import connection
+
+from trading.models import OptionTrade, Post, PriceFeed
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(connection.vendor != 'sqlite', reason='asserts SQLite EXPLAIN QUERY PLAN output'),
+]
+
+START = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def plan(qs) -> str:
+    return qs.explain()
+
+
+def test_open_trades_use_partial_index():
+    assert 'optiontrade_open_idx' in plan(OptionTrade.objects.filter(exit_price__isnull=True))
+
+
+def test_post_time_and_sector_lookups_use_indexes():
+    assert 'post_timestamp_idx' in plan(Post.objects.filter(timestamp__gte=START).order_by('timestamp'))
+    assert 'post_sector_ts_idx' in plan(Post.objects.filter(sector='energy', timestamp__gte=START))
+
+
+def test_pricefeed_range_scan_uses_index():
+    qs = PriceFeed.objects.for_token(1, start=START, end=START + datetime.timedelta(days=30), source='yfinance')
+    assert 'pricefeed_tok_src_ts_idx' in plan(qs)
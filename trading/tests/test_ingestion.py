@@ -1,8 +1,10 @@
 import datetime
 
-from django.test import TestCase
+from django.db import transaction
+from django.test import TestCase, override_settings
 
 from trading.injestion import TruthClient
+from trading.models import IngestionCursor
 
 
 class DummyStatus:
@@ -14,6 +16,7 @@ class DummyStatus:
         self.user_handle = 'testuser'
 
 
+@override_settings(TRUTH_HANDLE='testuser')
 class IngestionTest(TestCase):
     def setUp(self):
         # Create client and stub out sc.pull_statuses
@@ -24,30 +27,59 @@ class IngestionTest(TestCase):
             DummyStatus('2', 'Second post'),
             DummyStatus('1', 'First post'),
         ]
-        self.client.sc.pull_statuses = lambda username: list(self.statuses)
+        self.client.sc.pull_statuses = lambda username, **kwargs: list(self.statuses)
+
+    def checkpoint(self, status_id):
+        # what PostPipeline.persist does once a post is stored
+        with transaction.atomic():
+            IngestionCursor.objects.advance('testuser', status_id)
 
     def test_get_new_posts_first_time(self):
         # First call should return all posts in oldest-first order
         posts = list(self.client.get_new_posts())
         self.assertEqual([p.id for p in posts], ['1', '2', '3'])
-        # last_seen should be set to id of newest post
-        self.assertEqual(self.client.last_seen, '3')
+        # nothing stored yet, so there is no checkpoint to resume from
+        self.assertIsNone(self.client.last_seen)
 
     def test_get_new_posts_subsequent(self):
-        # First call to set last_seen
         _ = list(self.client.get_new_posts())
-        # Second call should yield no posts (nothing newer)
+        self.checkpoint('3')
+        # Second call should yield no posts (nothing newer than the checkpoint)
         posts2 = list(self.client.get_new_posts())
         self.assertEqual(posts2, [])
+        self.assertEqual(self.client.last_seen, '3')
+
+    def test_unstored_posts_are_fetched_again(self):
+        _ = list(self.client.get_new_posts())
+        # post 3 failed to store: the checkpoint stops at 2, so 3 comes back
+        self.checkpoint('2')
+        self.assertEqual([p.id for p in self.client.get_new_posts()], ['3'])
 
     def test_get_new_posts_with_new_items(self):
-        # First call
         _ = list(self.client.get_new_posts())
+        self.checkpoint('3')
         # Append a new status to front (newest)
         new_status = DummyStatus('4', 'Fourth post')
-        self.client.sc.pull_statuses = lambda username: [new_status] + list(self.statuses)
+        self.client.sc.pull_statuses = lambda username, **kwargs: [new_status] + list(self.statuses)
         posts3 = list(self.client.get_new_posts())
         # Should return only the new one
         self.assertEqual([p.id for p in posts3], ['4'])
-        # last_seen updated to '4'
-        self.assertEqual(self.client.last_seen, '4')
\ No newline at end of file
+        self.checkpoint('4')
+        self.assertEqual(self.client.get_new_posts(), [])
+        self.assertEqual(self.client.last_seen, '4')
+
+    def test_cursor_survives_restart(self):
+        posts = list(self.client.get_new_posts())
+        # fetching alone does not checkpoint; the pipeline does, as each post is stored
+        self.assertEqual(IngestionCursor.objects.get(handle='testuser').since_id, '')
+        self.assertEqual({p.source for p in posts}, {'testuser'})
+        with transaction.atomic():
+            IngestionCursor.objects.advance('testuser', '3')
+            IngestionCursor.objects.advance('testuser', '2')
+        self.assertEqual(IngestionCursor.objects.get(handle='testuser').since_id, '3')
+        # a fresh client (e.g. after a restart) asks only for statuses newer than the stored cursor
+        calls = []
+        restarted = TruthClient()
+        restarted.sc.pull_statuses = lambda username, **kwargs: calls.append(kwargs) or []
+        self.assertEqual(restarted.get_new_posts(), [])
+        self.assertEqual(calls, [{'since_id': '3'}])
@@ -0,0 +1,86 @@
+import datetime
+from decimal import Decimal
+from io import StringIO
+from types import SimpleNamespace
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from trading import latency
+from trading.models import LatencySpan, Post
+from trading.pipeline import PostPipeline
+
+
+def test_spans_only_recorded_while_collecting():
+    with latency.span('ignored'):
+        pass
+    with latency.collect() as spans:
+        with latency.span('a'):
+            with latency.span('b'):
+                pass
+        with latency.span('a'):
+            pass
+    assert [stage for stage, _ in spans] == ['b', 'a', 'a']
+    assert set(latency.totals(spans)) == {'a', 'b'}
+
+
+class StrongNLP:
+    @staticmethod
+    def process_post(text):
+        with latency.span('llm_classify'):
+            return 'energy', 'strongly_bullish'
+
+
+def fake_decide_trade(sector, sentiment):
+    with latency.span('quote_fetch'):
+        pass
+    with latency.span('chain_fetch'):
+        pass
+    return {
+        'ticker': 'XLE', 'option_type': 'CALL', 'strike': Decimal('100'),
+        'expiry': datetime.date.today(), 'entry_price': Decimal('1.50'),
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('concurrency', [1, 4])
+def test_pipeline_records_spans_per_post(monkeypatch, concurrency):
+    monkeypatch.setattr('trading.pipeline.decide_trade', fake_decide_trade)
+    now = timezone.now()
+    posts = [
+        SimpleNamespace(id=str(i), text=str(i), created_at=now - datetime.timedelta(seconds=30), user_handle='u',
+                        fetched_at=now, spans=[('ingest_fetch', 0.2)])
+        for i in range(3)
+    ]
+    list(PostPipeline(StrongNLP, concurrency=concurrency).run(posts))
+    for post in Post.objects.all():
+        stages = dict(post.latency_spans.values_list('stage', 'seconds'))
+        assert set(stages) == {
+            'detect', 'ingest_fetch', 'llm_classify', 'quote_fetch', 'chain_fetch',
+            'db_persist', 'trade_write', 'signal_to_order',
+        }
+        assert stages['detect'] == pytest.approx(30)
+        assert stages['signal_to_order'] >= 30
+
+
+@pytest.mark.django_db
+def test_latency_tracking_can_be_disabled(settings):
+    settings.LATENCY_TRACKING = False
+    post = Post.objects.create(tweet_id='1', user_handle='u', text='x', timestamp=timezone.now())
+    assert latency.save(post, [('llm_classify', 1.0)]) == []
+    assert not LatencySpan.objects.exists()
+
+
+@pytest.mark.django_db
+def test_latency_report():
+    post = Post.objects.create(tweet_id='1', user_handle='u', text='x', timestamp=timezone.now())
+    LatencySpan.objects.bulk_create(
+        [LatencySpan(post=post, stage='llm_classify', seconds=i / 1000) for i in range(1, 101)]
+        + [LatencySpan(post=post, stage='detect', seconds=30)]
+    )
+    out = StringIO()
+    call_command('latency_report', stdout=out)
+    lines = out.getvalue().splitlines()
+    assert lines[1].split() == ['detect', '1', '30000.0', '30000.0', '30000.0', '30000.0']
+    assert lines[2].split() == ['llm_classify', '100', '50.5', '95.0', '99.0', '100.0']
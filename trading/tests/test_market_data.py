@@ -0,0 +1,114 @@
+import threading
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pandas as pd
+import yfinance as yf
+
+from trading import market_data
+from trading.execution import decide_trade
+
+
+class CountingTicker:
+    chain_calls = 0
+    def __init__(self, symbol):
+        self.symbol = symbol
+    def history(self, period):
+        return pd.DataFrame({'Close': [10.0]})
+    def option_chain(self, expiry):
+        CountingTicker.chain_calls += 1
+        time.sleep(0.05)  # slow enough for concurrent callers to overlap
+        df = pd.DataFrame({'strike': [10.0], 'bid': [1.0], 'ask': [1.2], 'lastPrice': [1.1]})
+        return SimpleNamespace(calls=df, puts=df)
+
+
+def test_option_chain_cached_and_coalesced(monkeypatch):
+    monkeypatch.setattr(yf, 'Ticker', CountingTicker)
+    CountingTicker.chain_calls = 0
+    threads = [
+        threading.Thread(target=market_data.get_option_chain, args=('XLE', '2025-05-02'))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    market_data.get_option_chain('XLE', '2025-05-02')
+    assert CountingTicker.chain_calls == 1
+    # a different expiry is a different key
+    market_data.get_option_chain('XLE', '2025-05-09')
+    assert CountingTicker.chain_calls == 2
+
+
+def test_failed_fetch_not_cached(monkeypatch):
+    calls = []
+    class FlakyTicker(CountingTicker):
+        def option_chain(self, expiry):
+            calls.append(expiry)
+            raise ValueError('no chain')
+    monkeypatch.setattr(yf, 'Ticker', FlakyTicker)
+    for _ in range(2):
+        try:
+            market_data.get_option_chain('XLF', '2025-05-02')
+        except ValueError:
+            pass
+    assert len(calls) == 2
+
+
+def test_chain_index_nearest_and_batch():
+    df = pd.DataFrame({
+        'strike': [105.0, 95.0, 100.0, 110.0],
+        'bid': [0.4, 5.5, 1.9, 0.1],
+        'ask': [0.6, 6.0, 2.1, 0.2],
+        'lastPrice': [0.5, 5.8, 2.0, 0.15],
+    })
+    index = market_data.ChainIndex(df)
+    # 101 is not listed: nearest is 100
+    assert index.nearest(101) == {'strike': 100.0, 'bid': 1.9, 'ask': 2.1, 'lastPrice': 2.0}
+    assert index.nearest(101, tolerance=0) is None
+    result = index.lookup([90, 95, 107.6, 200], tolerance=5)
+    assert result['found'].tolist() == [True, True, True, False]
+    assert result['strike'][:3].tolist() == [95.0, 95.0, 110.0]
+    assert result['ask'][:3].tolist() == [6.0, 6.0, 0.2]
+
+
+def test_decide_trade_uses_nearest_listed_strike(monkeypatch):
+    class UnlistedTicker(CountingTicker):
+        def history(self, period):
+            return pd.DataFrame({'Close': [101.2]})
+        def option_chain(self, expiry):
+            df = pd.DataFrame({'strike': [95.0, 100.0, 105.0], 'bid': [6.0, 1.8, 0.3], 'ask': [6.5, 2.2, 0.4]})
+            return SimpleNamespace(calls=df, puts=df)
+    monkeypatch.setattr(yf, 'Ticker', UnlistedTicker)
+    info = decide_trade('energy', 'strongly_bullish')
+    assert info['strike'] == Decimal('100')
+    assert info['entry_price'] == Decimal('2.2')
+
+
+
+def test_decide_trade_ignores_strikes_beyond_tolerance(monkeypatch, settings):
+    settings.ATM_STRIKE_TOLERANCE = 0.05
+    class SparseTicker(CountingTicker):
+        def history(self, period):
+            return pd.DataFrame({'Close': [101.2]})
+        def option_chain(self, expiry):
+            df = pd.DataFrame({'strike': [60.0, 150.0], 'bid': [40.0, 0.1], 'ask': [41.0, 0.2]})
+            return SimpleNamespace(calls=df, puts=df)
+    monkeypatch.setattr(yf, 'Ticker', SparseTicker)
+    info = decide_trade('energy', 'strongly_bearish')
+    # no listed strike within 5%: keep the rounded ATM strike and price it at intrinsic
+    assert info['strike'] == Decimal('101')
+    assert info['entry_ask'] is None
+    assert info['entry_price'] == Decimal('0')
+
+def test_expired_entries_are_pruned(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(market_data.time, 'monotonic', lambda: now[0])
+    cache = market_data.TTLCache(ttl=5)
+    for expiry in range(10):
+        cache.get_or_load(('chain', 'XLE', expiry), lambda: 'chain')
+    assert len(cache) == 10
+    now[0] += 6
+    cache.get_or_load(('chain', 'XLE', 'new'), lambda: 'chain')
+    assert len(cache) == 1
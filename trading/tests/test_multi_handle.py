@@ -0,0 +1,101 @@
+import threading
+import time
+
+import pytest
+from django.db import transaction
+
+from truthbrush import Api as TruthScooper
+
+from trading.injestion import MultiHandleTruthClient, RateBudget, TruthSession
+from trading.models import IngestionCursor
+
+TIMELINES = {
+    # newest first, as truthbrush returns them
+    'alice': [
+        {'id': '12', 'content': 'alice two', 'created_at': '2025-04-21T12:03:00Z', 'account': {'acct': 'alice'}},
+        {'id': '10', 'content': 'alice one', 'created_at': '2025-04-21T12:00:00Z', 'account': {'acct': 'alice'}},
+    ],
+    'bob': [
+        {'id': '11', 'content': 'bob one', 'created_at': '2025-04-21T12:01:00Z', 'account': {'acct': 'bob'}},
+    ],
+}
+
+
+@pytest.fixture
+def client():
+    mc = MultiHandleTruthClient(handles=['alice', 'bob'])
+    mc.calls = []
+
+    def pull_statuses(username, since_id=None, **kwargs):
+        mc.calls.append((username, since_id, threading.current_thread().name))
+        return [s for s in TIMELINES[username] if not since_id or int(s['id']) > int(since_id)]
+
+    mc.sc.pull_statuses = pull_statuses
+    return mc
+
+
+@pytest.mark.django_db
+def test_merges_handles_in_time_order(client):
+    posts = client.get_new_posts()
+    assert [(p.id, p.user_handle) for p in posts] == [('10', 'alice'), ('11', 'bob'), ('12', 'alice')]
+    assert {p.source for p in posts} == {'alice', 'bob'}
+    # every handle shares one authenticated session
+    assert all(c.sc is client.sc for c in client.clients)
+
+
+@pytest.mark.django_db
+def test_each_handle_resumes_from_its_cursor(client):
+    for post in client.get_new_posts():
+        with transaction.atomic():
+            IngestionCursor.objects.advance(post.source, post.id)
+    assert client.get_new_posts() == []
+    assert [(c.handle, c.last_seen) for c in client.clients] == [('alice', '12'), ('bob', '11')]
+    assert sorted(call[:2] for call in client.calls[2:]) == [('alice', '12'), ('bob', '11')]
+
+
+@pytest.mark.django_db
+def test_failing_handle_does_not_block_others(client):
+    pull = client.sc.pull_statuses
+
+    def flaky(username, **kwargs):
+        if username == 'bob':
+            raise ConnectionError('boom')
+        return pull(username, **kwargs)
+
+    client.sc.pull_statuses = flaky
+    assert [p.id for p in client.get_new_posts()] == ['10', '12']
+    assert client.clients[1].last_seen is None
+
+
+def test_session_caches_account_lookups(monkeypatch):
+    lookups = []
+    monkeypatch.setattr(TruthScooper, 'lookup', lambda self, handle=None: lookups.append(handle) or {'id': handle})
+    session = TruthSession('user', 'pass', 'token')
+    assert session.lookup('alice') == {'id': 'alice'}
+    session.lookup('alice')
+    session.lookup('bob')
+    assert lookups == ['alice', 'bob']
+
+
+@pytest.mark.django_db
+def test_failed_account_lookup_is_retried_next_poll(monkeypatch):
+    answers = iter([None, {'error': 'Record not found'}, {'id': '42'}])
+    lookups = []
+    monkeypatch.setattr(TruthScooper, 'lookup', lambda self, handle=None: lookups.append(handle) or next(answers))
+    # one page of statuses, then an empty page
+    monkeypatch.setattr(TruthScooper, '_get', lambda self, url, params=None: [] if params else TIMELINES['alice'])
+    client = MultiHandleTruthClient(handles=['alice'])
+    assert client.get_new_posts() == []
+    assert client.get_new_posts() == []
+    assert [p.id for p in client.get_new_posts()] == ['10', '12']
+    # the account is cached once found
+    client.get_new_posts()
+    assert lookups == ['alice'] * 3
+
+
+def test_rate_budget_throttles_bursts():
+    budget = RateBudget(limit=5, window=0.5)  # 10 requests/s once the burst is spent
+    started = time.monotonic()
+    for _ in range(7):
+        budget.acquire()
+    assert time.monotonic() - started >= 0.15
@@ -0,0 +1,131 @@
+import json
+from types import SimpleNamespace
+
+import openai
+import pytest
+
+from trading.classification_cache import ClassificationCache
+from trading.execution import UNCLASSIFIED
+from trading.injestion import BATCH_SCHEMA, SECTORS, ClassificationError, NLPService
+from trading.models import ClassificationCacheEntry
+
+
+@pytest.mark.django_db
+def test_classify_batch_single_request(monkeypatch):
+    prompts = []
+    def fake_chat(prompt, max_tokens=8, schema=None):
+        prompts.append(prompt)
+        assert schema == BATCH_SCHEMA
+        return json.dumps({'labels': [
+            {'sector': 'energy', 'sentiment': 'strongly_bullish'},
+            {'sector': 'none', 'sentiment': 'neutral'},
+        ]})
+    monkeypatch.setattr(NLPService, '_chat', staticmethod(fake_chat))
+    results = NLPService.classify_batch(['Drill baby drill', 'Happy Easter'])
+    assert results == [('energy', 'strongly_bullish'), ('none', 'neutral')]
+    assert len(prompts) == 1
+    assert '1. Drill baby drill' in prompts[0] and '2. Happy Easter' in prompts[0]
+
+
+@pytest.mark.django_db
+def test_classify_batch_falls_back_per_post(monkeypatch):
+    # Batch reply has the wrong number of entries -> one call per post
+    replies = iter([
+        '{"labels": [{"sector": "energy", "sentiment": "bullish"}]}',
+        '{"sector": "finance", "sentiment": "bearish"}',
+        '{"sector": "energy", "sentiment": "bullish"}',
+    ])
+    monkeypatch.setattr(NLPService, '_chat', staticmethod(lambda prompt, max_tokens=8, schema=None: next(replies)))
+    results = NLPService.classify_batch(['a', 'b'])
+    assert results == [('finance', 'bearish'), ('energy', 'bullish')]
+
+
+@pytest.mark.django_db
+def test_process_post_uses_cache(monkeypatch):
+    calls = []
+    def fake_chat(prompt, max_tokens=8, schema=None):
+        calls.append(prompt)
+        return '{"sector": "defense", "sentiment": "strongly_bullish"}'
+    monkeypatch.setattr(NLPService, '_chat', staticmethod(fake_chat))
+    before = NLPService.cache().stats()
+    assert NLPService.process_post('Big  order for  JETS') == ('defense', 'strongly_bullish')
+    # whitespace differences normalize to the same key
+    assert NLPService.process_post(' Big order for JETS ') == ('defense', 'strongly_bullish')
+    assert len(calls) == 1
+    after = NLPService.cache().stats()
+    assert after['hits'] - before['hits'] == 1
+    assert after['misses'] - before['misses'] == 1
+    assert ClassificationCacheEntry.objects.get().hits == 1
+
+
+@pytest.mark.django_db
+def test_parse_errors_are_not_cached(monkeypatch, settings):
+    settings.NLP_MAX_RETRIES = 2
+    calls = []
+    monkeypatch.setattr(NLPService, '_chat', staticmethod(lambda prompt, max_tokens=8, schema=None: calls.append(1) or 'sorry, no idea'))
+    # a failed classification is distinguishable from a real neutral answer
+    assert NLPService._classify_and_store('unclear', NLPService.cache()) == UNCLASSIFIED
+    assert len(calls) == 3
+    assert not ClassificationCacheEntry.objects.exists()
+
+
+@pytest.mark.parametrize('reply', [
+    '{"sector": "crypto", "sentiment": "bullish"}',  # not in the enum
+    '{"sector": "energy"}',
+    '[]',
+])
+def test_invalid_labels_raise(monkeypatch, settings, reply):
+    settings.NLP_MAX_RETRIES = 0
+    monkeypatch.setattr(NLPService, '_chat', staticmethod(lambda prompt, max_tokens=8, schema=None: reply))
+    with pytest.raises(ClassificationError):
+        NLPService._sector_and_sentiment('post')
+
+
+def test_retries_transient_errors_then_parse_failures(monkeypatch, settings):
+    settings.NLP_MAX_RETRIES = 2
+    settings.NLP_RETRY_BACKOFF = 0
+    replies = iter([
+        openai.APIConnectionError(request=None),
+        'not json',
+        '{"sector": "energy", "sentiment": "neutral"}',
+    ])
+
+    def fake_chat(prompt, max_tokens=8, schema=None):
+        reply = next(replies)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    monkeypatch.setattr(NLPService, '_chat', staticmethod(fake_chat))
+    assert NLPService._sector_and_sentiment('post') == ('energy', 'neutral')
+
+
+def test_chat_requests_structured_output(monkeypatch, settings):
+    settings.OPENAI_API_KEY = 'sk-test'
+    requests = []
+
+    def create(**kwargs):
+        requests.append(kwargs)
+        message = SimpleNamespace(content='{"sector": "defense", "sentiment": "bullish"}', refusal=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason='stop')])
+
+    monkeypatch.setattr(openai.chat.completions, 'create', create)
+    assert NLPService._sector_and_sentiment('Big order for jets') == ('defense', 'bullish')
+    fmt = requests[0]['response_format']
+    assert fmt['type'] == 'json_schema' and fmt['json_schema']['strict']
+    assert fmt['json_schema']['schema']['properties']['sector']['enum'] == SECTORS
+    assert requests[0]['max_tokens'] <= 32
+
+
+@pytest.mark.django_db
+def test_cache_eviction_by_ttl_and_size():
+    cache = ClassificationCache('v-test', ttl=3600, max_entries=2)
+    for i in range(3):
+        cache.set(f'post {i}', ('energy', 'bullish'))
+    ClassificationCacheEntry.objects.filter(key=cache.key('post 0')).update(
+        created_at='2000-01-01T00:00:00Z', last_used_at='2000-01-01T00:00:00Z')
+    assert cache.get('post 0') is None  # expired
+    cache.set('post 3', ('energy', 'bullish'))
+    cache.evict()
+    assert ClassificationCacheEntry.objects.count() == 2
+    assert cache.get('post 3') == ('energy', 'bullish')
@@ -0,0 +1,72 @@
+import json
+from io import StringIO
+from types import SimpleNamespace
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from trading.models import Post
+from trading.nlp_backends import LexiconNLPService, ReplayNLPService
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Drill baby drill! Oil production at a record high, great jobs', ('energy', 'strongly_bullish')),
+    ('New sanctions on foreign steel', ('industrials', 'bearish')),
+    ('Massive new tariffs on chips, effective immediately', ('technology', 'strongly_bearish')),
+    ('Thank you Iowa!', ('none', 'neutral')),
+])
+def test_lexicon(text, expected):
+    assert LexiconNLPService.process_post(text) == expected
+
+
+@pytest.fixture
+def replay(settings, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr('trading.nlp_backends.time.sleep', sleeps.append)
+    settings.NLP_REPLAY_LATENCY = 0.25
+    settings.NLP_REPLAY_JITTER = 0
+    settings.NLP_BATCH_SIZE = 2
+    ReplayNLPService.reset()
+    yield sleeps
+    ReplayNLPService.reset()
+
+
+def test_replay_from_file(replay, settings, tmp_path):
+    path = tmp_path / 'posts.ndjson'
+    path.write_text('\n'.join(json.dumps(row) for row in [
+        {'id': 1, 'text': 'Big  order for JETS', 'sector': 'defense', 'sentiment': 'strongly_bullish'},
+        {'id': 2, 'text': 'Happy Easter', 'sector': 'none', 'sentiment': 'neutral'},
+    ]) + '\n')
+    settings.NLP_REPLAY_PATH = str(path)
+    assert ReplayNLPService.process_post(' Big order for JETS ') == ('defense', 'strongly_bullish')
+    assert replay == [0.25]
+    # three posts in chunks of two: two simulated round-trips; unrecorded text falls back to the lexicon
+    assert ReplayNLPService.classify_batch(['Happy Easter', 'Big order for JETS', 'Oil up, great jobs']) == [
+        ('none', 'neutral'), ('defense', 'strongly_bullish'), ('energy', 'strongly_bullish'),
+    ]
+    assert replay == [0.25] * 3
+
+
+@pytest.mark.django_db
+def test_replay_from_posts(replay, settings):
+    settings.NLP_REPLAY_PATH = None
+    Post.objects.create(tweet_id='1', user_handle='u', text='Recorded', timestamp=timezone.now(),
+                        sector='finance', sentiment='bearish')
+    assert ReplayNLPService.process_post('Recorded') == ('finance', 'bearish')
+
+
+class OneShotIngestion:
+    def get_new_posts(self):
+        return [SimpleNamespace(id=str(i), text=text, created_at=timezone.now(), user_handle='u')
+                for i, text in enumerate(['Thank you Iowa!', 'New sanctions on foreign steel'])]
+
+
+@pytest.mark.django_db
+def test_run_bot_offline(settings):
+    settings.INGESTION_CLASS = 'trading.tests.test_nlp_backends.OneShotIngestion'
+    settings.NLP_SERVICE_CLASS = 'trading.nlp_backends.LexiconNLPService'
+    out = StringIO()
+    call_command('run_bot', '--once', stdout=out)
+    assert dict(Post.objects.values_list('tweet_id', 'sentiment')) == {'0': 'neutral', '1': 'bearish'}
+    assert "Signal 'bearish' not strong enough" in out.getvalue()
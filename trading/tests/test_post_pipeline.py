@@ -0,0 +1,129 @@
+import datetime
+import threading
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from django.utils import timezone
+
+from trading.models import IngestionCursor, OptionTrade, Post
+from trading.pipeline import PostPipeline
+
+
+class EchoNLP:
+    """Classifier stub that passes the post number through as the sector, for slow_decide_trade."""
+    @staticmethod
+    def process_post(text):
+        return text, 'strongly_bullish'
+
+
+def fake_decide_trade(sector, sentiment):
+    return {
+        'ticker': 'XLE', 'option_type': 'CALL', 'strike': Decimal('100'),
+        'expiry': datetime.date.today(), 'entry_price': Decimal('1.50'),
+    }
+
+
+def slow_decide_trade(sector, sentiment):
+    # pricing runs on the worker pool: earlier posts take longer, so workers finish out of order
+    time.sleep(0.05 / int(sector))
+    return fake_decide_trade(sector, sentiment)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('concurrency', [1, 4])
+def test_pipeline_writes_trades_in_post_order(monkeypatch, concurrency):
+    monkeypatch.setattr('trading.pipeline.decide_trade', slow_decide_trade)
+    posts = [
+        SimpleNamespace(id=str(i), text=str(i), created_at=timezone.now(), user_handle='u')
+        for i in range(1, 6)
+    ]
+    results = list(PostPipeline(EchoNLP, concurrency=concurrency).run(posts))
+    assert [r.status.id for r in results] == ['1', '2', '3', '4', '5']
+    trades = OptionTrade.objects.order_by('id')
+    assert [t.post.tweet_id for t in trades] == ['1', '2', '3', '4', '5']
+
+
+class ThreadRecordingNLP:
+    threads = set()
+    @classmethod
+    def process_post(cls, text):
+        cls.threads.add(threading.current_thread())
+        return 'energy', 'strongly_bullish'
+
+
+@pytest.mark.django_db
+def test_pipeline_classifies_on_calling_thread(monkeypatch):
+    # classification may use the DB-backed cache, so only pricing goes to the workers
+    pricing_threads = set()
+
+    def decide(sector, sentiment):
+        pricing_threads.add(threading.current_thread())
+        return fake_decide_trade(sector, sentiment)
+    monkeypatch.setattr('trading.pipeline.decide_trade', decide)
+    ThreadRecordingNLP.threads = set()
+    posts = [SimpleNamespace(id=str(i), text=str(i), created_at=timezone.now(), user_handle='u') for i in range(4)]
+    list(PostPipeline(ThreadRecordingNLP, concurrency=4).run(posts))
+    assert ThreadRecordingNLP.threads == {threading.current_thread()}
+    assert threading.current_thread() not in pricing_threads
+
+
+class BatchNLP:
+    batches = []
+    @classmethod
+    def classify_batch(cls, texts):
+        cls.batches.append(list(texts))
+        return [('none', 'neutral')] * len(texts)
+    @staticmethod
+    def process_post(text):
+        raise AssertionError('per-post classification should not be used for bursts')
+
+
+@pytest.mark.django_db
+def test_pipeline_batches_bursts():
+    posts = [
+        SimpleNamespace(id=str(i), text=f'post {i}', created_at=timezone.now(), user_handle='u')
+        for i in range(3)
+    ]
+    results = list(PostPipeline(BatchNLP).run(posts))
+    assert BatchNLP.batches == [['post 0', 'post 1', 'post 2']]
+    assert [r.sentiment for r in results] == ['neutral'] * 3
+
+
+class CountingNLP:
+    calls = []
+    @classmethod
+    def process_post(cls, text):
+        cls.calls.append(text)
+        if text == 'boom':
+            raise RuntimeError('classifier down')
+        return 'none', 'neutral'
+
+
+def make_status(id, text=None):
+    return SimpleNamespace(id=id, text=text or f'post {id}', created_at=timezone.now(), user_handle='u', source='u')
+
+
+@pytest.mark.django_db
+def test_pipeline_skips_known_posts_without_classifying():
+    CountingNLP.calls = []
+    list(PostPipeline(CountingNLP).run([make_status('1'), make_status('2')]))
+    CountingNLP.calls = []
+    # a restart re-fetches the same page plus one new post
+    pipeline = PostPipeline(CountingNLP)
+    results = list(pipeline.run([make_status('1'), make_status('2'), make_status('3'), make_status('3')]))
+    assert [r.status.id for r in results] == ['3']
+    assert CountingNLP.calls == ['post 3']
+    assert pipeline.skipped == 2
+    assert IngestionCursor.objects.get(handle='u').since_id == '3'
+
+
+@pytest.mark.django_db
+def test_pipeline_checkpoints_each_stored_post():
+    pipeline = PostPipeline(CountingNLP)
+    with pytest.raises(RuntimeError):
+        list(pipeline.run([make_status('9'), make_status('10'), make_status('11', 'boom')]))
+    # posts up to the failure are stored and checkpointed; the failed one is fetched again next time
+    assert IngestionCursor.objects.get(handle='u').since_id == '10'
+    assert not Post.objects.filter(tweet_id='11').exists()
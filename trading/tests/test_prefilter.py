@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from trading.models import Post
+from trading.pipeline import PostPipeline
+from trading.prefilter import RelevanceFilter, load_prefilter
+
+ACTIONABLE = [
+    'Massive tariffs on Chinese steel start Monday',
+    'We will drill baby drill, oil prices coming down',
+    'Huge new defense contracts for our great military',
+    'Tariffs on all foreign chips, bring manufacturing home',
+]
+NOISE = [
+    'Happy birthday to a great friend',
+    'The fake news media is at it again',
+    'Thank you Iowa, what a crowd tonight',
+    'Watch the great interview tonight on TV',
+]
+
+
+def test_untrained_filter_uses_keywords():
+    f = RelevanceFilter(threshold=0.5)
+    assert f.relevant('New TARIFFS on imported cars!')
+    assert not f.relevant('What a crowd tonight!')
+    assert f.stats() == {'passed': 1, 'skipped': 1}
+
+
+def test_trained_filter_separates_classes(tmp_path):
+    f = RelevanceFilter.fit(ACTIONABLE + NOISE, [True] * 4 + [False] * 4, threshold=0.5, min_count=1)
+    assert f.score('tariffs on steel and chips') > 0.9
+    assert f.score('great crowd tonight, thank you') < 0.1
+    path = tmp_path / 'prefilter.json'
+    f.save(path)
+    loaded = RelevanceFilter.load(path, threshold=0.5)
+    assert loaded.score('tariffs on steel') == pytest.approx(f.score('tariffs on steel'))
+
+
+def test_fit_needs_both_classes():
+    with pytest.raises(ValueError):
+        RelevanceFilter.fit(NOISE, [False] * 4)
+
+
+def test_load_prefilter(settings, tmp_path):
+    settings.PREFILTER_ENABLED = False
+    assert load_prefilter() is None
+    settings.PREFILTER_ENABLED = True
+    settings.PREFILTER_MODEL_PATH = tmp_path / 'missing.json'
+    assert not load_prefilter().trained
+
+
+class RecordingNLP:
+    texts = []
+    @classmethod
+    def process_post(cls, text):
+        cls.texts.append(text)
+        return 'none', 'neutral'
+
+
+@pytest.mark.django_db
+def test_pipeline_skips_llm_for_irrelevant_posts():
+    RecordingNLP.texts = []
+    posts = [
+        SimpleNamespace(id=str(i), text=text, created_at=timezone.now(), user_handle='u')
+        for i, text in enumerate(['Tariffs on steel!', 'Thank you Iowa'])
+    ]
+    prefilter = RelevanceFilter(threshold=0.5)
+    list(PostPipeline(RecordingNLP, prefilter=prefilter).run(posts))
+    assert RecordingNLP.texts == ['Tariffs on steel!']
+    assert prefilter.stats() == {'passed': 1, 'skipped': 1}
+    # skipped posts are stored unclassified, so they never become training labels
+    assert Post.objects.get(tweet_id='1').sentiment == ''
+
+
+@pytest.mark.django_db
+def test_train_prefilter_command(tmp_path, capsys):
+    for i, (text, sentiment) in enumerate(
+        [(t, 'strongly_bullish') for t in ACTIONABLE] + [(t, 'neutral') for t in NOISE] + [('Unseen', '')]
+    ):
+        Post.objects.create(tweet_id=str(i), user_handle='u', text=text, timestamp=timezone.now(), sentiment=sentiment)
+    out = tmp_path / 'model.json'
+    call_command('train_prefilter', output=str(out), threshold=0.5, min_count=1)
+    assert 'Trained on 8 posts (4 actionable)' in capsys.readouterr().out
+    assert RelevanceFilter.load(out).trained
@@ -0,0 +1,44 @@
+import datetime as dt
+
+import pytest
+
+from trading.scheduler import PollScheduler, market_open
+
+# Saturday / Wednesday 12:00 ET
+WEEKEND = dt.datetime(2025, 4, 19, 16, 0, tzinfo=dt.timezone.utc)
+MARKET_HOURS = dt.datetime(2025, 4, 23, 16, 0, tzinfo=dt.timezone.utc)
+
+
+@pytest.fixture
+def scheduler():
+    return PollScheduler(base=60, fastest=10, slowest=600, backoff=2, active_window=900, market_cap=30)
+
+
+def test_market_open():
+    assert market_open(MARKET_HOURS)
+    assert not market_open(WEEKEND)
+    assert not market_open(dt.datetime(2025, 4, 23, 13, 0, tzinfo=dt.timezone.utc))  # 09:00 ET
+
+
+def test_backs_off_while_quiet(scheduler):
+    delays = []
+    for _ in range(6):
+        scheduler.record(0)
+        delays.append(scheduler.next_delay(now=0, wall=WEEKEND))
+    assert delays == [120, 240, 480, 600, 600, 600]
+
+
+def test_market_hours_cap_the_delay(scheduler):
+    for _ in range(5):
+        scheduler.record(0)
+    assert scheduler.next_delay(now=0, wall=MARKET_HOURS) == 30
+
+
+def test_fast_after_activity(scheduler):
+    for _ in range(5):
+        scheduler.record(0)
+    scheduler.record(3, now=1000)
+    assert scheduler.next_delay(now=1100, wall=WEEKEND) == 10
+    # activity ages out of the window; quiet polls back off from the base again
+    scheduler.record(0)
+    assert scheduler.next_delay(now=2000, wall=WEEKEND) == 120
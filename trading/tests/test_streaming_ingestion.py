@@ -0,0 +1,84 @@
+import time
+from unittest import mock
+
+import pytest
+
+from trading.injestion import StreamingTruthClient
+from trading.models import IngestionCursor
+from trading.tests.fake_truth_server import FakeTruthStream
+
+
+@pytest.fixture
+def stream(settings):
+    settings.TRUTH_STREAM_WAIT = 5
+    settings.TRUTH_STREAM_BACKOFF_MAX = 0.2
+    server = FakeTruthStream()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def client(stream, transactional_db):
+    # the stream thread reads the cursor on its own connection, so the test must not hold a transaction
+    tc = StreamingTruthClient(url=stream.url, token='secret', handle='testuser')
+    tc.sc.pull_statuses = mock.Mock(return_value=[])
+    yield tc
+    tc.close()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def test_yields_posts_as_they_arrive(stream, client):
+    client.start()
+    wait_for(lambda: client.connects == 1)
+    stream.push('1', 'First post')
+    stream.push('2', 'Other account', acct='someoneelse')
+    stream.push('3', 'Second post')
+    wait_for(lambda: client._queue.qsize() == 2)
+    posts = client.get_new_posts()
+    assert [p.id for p in posts] == ['1', '3']
+    assert posts[0].text == 'First post'
+    assert posts[0].user_handle == 'testuser'
+    assert posts[0].created_at.year == 2025
+    assert client.last_seen == '3'
+    assert stream.auth_headers == ['Bearer secret']
+
+
+def test_returns_empty_when_nothing_arrives(stream, client, settings):
+    client.wait = 0.05
+    assert client.get_new_posts() == []
+
+
+def test_reconnects_after_stream_drops(stream, client):
+    client.start()
+    wait_for(lambda: client.connects == 1)
+    stream.drop()
+    wait_for(lambda: client.connects == 2)
+    stream.push('4', 'After reconnect')
+    assert [p.id for p in client.get_new_posts()] == ['4']
+
+
+def test_backfills_posts_missed_while_disconnected(stream, client):
+    client.start()
+    # in-memory SQLite locks whole tables: let the first connect's backfill finish before writing
+    wait_for(lambda: client.sc.pull_statuses.called)
+    # the pipeline stored post 4; 5 and 6 are published while the stream is down
+    IngestionCursor.objects.advance('testuser', '4')
+    client.sc.pull_statuses.return_value = [
+        {'id': id, 'content': f'missed {id}', 'created_at': '2025-04-21T11:00:00Z', 'account': {'acct': 'testuser'}}
+        for id in ('6', '5', '4')
+    ]
+    stream.drop()
+    wait_for(lambda: client.connects == 2)
+    stream.push('7', 'After reconnect')
+    wait_for(lambda: client._queue.qsize() == 3)
+    posts = client.get_new_posts()
+    assert [p.id for p in posts] == ['5', '6', '7']
+    assert client.sc.pull_statuses.call_args.kwargs['since_id'] == '4'
+    # streamed and backfilled posts both checkpoint the handle's cursor
+    assert {p.source for p in posts} == {'testuser'}
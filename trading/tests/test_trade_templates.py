@@ -0,0 +1,127 @@
+import datetime
+import time
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+
+from trading import execution, market_data, trade_templates
+from trading.benchmarks import UNDERLYING, FakeTicker
+from trading.metrics import STAGE_SECONDS, TEMPLATE_LOOKUPS
+from trading.trade_templates import TemplateWarmer
+
+
+@pytest.fixture(autouse=True)
+def no_warmer():
+    trade_templates.stop()
+    yield
+    trade_templates.stop()
+
+
+@pytest.fixture
+def fake_yf():
+    with mock.patch.object(market_data.yf, 'Ticker', FakeTicker):
+        yield
+
+
+def fake_price(ticker, opt_type):
+    return {'ticker': ticker, 'option_type': opt_type, 'strike': Decimal('100')}
+
+
+def test_refresh_prices_both_sides_of_every_ticker():
+    calls = []
+    warmer = TemplateWarmer(lambda t, o: calls.append((t, o)) or fake_price(t, o), ['XLE', 'XLK'])
+    warmer.refresh()
+    assert sorted(calls) == [('XLE', 'CALL'), ('XLE', 'PUT'), ('XLK', 'CALL'), ('XLK', 'PUT')]
+    assert warmer.get('XLK', 'PUT')['option_type'] == 'PUT'
+
+
+def test_refresh_reuses_one_pool_and_records_no_signal_path_spans(fake_yf):
+    quotes = STAGE_SECONDS.value(stage='quote_fetch')
+    refreshes = STAGE_SECONDS.value(stage='template_refresh')
+    warmer = TemplateWarmer(execution.price_trade, ['XLE'])
+    warmer.refresh()
+    pool = warmer._pool
+    warmer.refresh()
+    assert warmer._pool is pool
+    assert warmer.get('XLE', 'CALL')['ticker'] == 'XLE'
+    # warm-ups are timed as one stage of their own, not as quote/chain fetches
+    assert STAGE_SECONDS.value(stage='quote_fetch') == quotes
+    assert STAGE_SECONDS.value(stage='template_refresh') == refreshes + 2
+    warmer.stop()
+    assert warmer._pool is None
+
+
+def test_get_returns_a_copy_and_counts_lookups():
+    warmer = TemplateWarmer(fake_price, ['XLE'])
+    hits, misses = TEMPLATE_LOOKUPS.value(result='hit'), TEMPLATE_LOOKUPS.value(result='miss')
+    assert warmer.get('XLE', 'CALL') is None
+    warmer.refresh()
+    warmer.get('XLE', 'CALL')['strike'] = Decimal('1')
+    assert warmer.get('XLE', 'CALL')['strike'] == Decimal('100')
+    assert TEMPLATE_LOOKUPS.value(result='hit') == hits + 2
+    assert TEMPLATE_LOOKUPS.value(result='miss') == misses + 1
+
+
+def test_stale_and_previous_day_templates_are_ignored():
+    warmer = TemplateWarmer(fake_price, ['XLE'], max_age=15)
+    warmer.refresh()
+    priced_at, priced_on, info = warmer._templates[('XLE', 'CALL')]
+    warmer._templates[('XLE', 'CALL')] = (priced_at - 16, priced_on, info)
+    assert warmer.get('XLE', 'CALL') is None
+    warmer._templates[('XLE', 'PUT')] = (time.monotonic(), priced_on - datetime.timedelta(days=1), info)
+    assert warmer.get('XLE', 'PUT') is None
+
+
+def test_failed_refresh_keeps_previous_template():
+    prices = iter([fake_price('XLE', 'CALL'), RuntimeError('yfinance down')])
+
+    def flaky(ticker, opt_type):
+        result = next(prices)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    warmer = TemplateWarmer(flaky, ['XLE'])
+    warmer.targets = [('XLE', 'CALL')]
+    warmer.refresh()
+    warmer.refresh()
+    assert warmer.get('XLE', 'CALL')['strike'] == Decimal('100')
+
+
+def test_decide_trade_uses_template_without_market_data(fake_yf):
+    warmer = trade_templates.start(execution.price_trade, ['XLE'], interval=60)
+    deadline = time.monotonic() + 5
+    while warmer.get('XLE', 'PUT') is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with mock.patch.object(market_data, 'get_history', side_effect=AssertionError('live fetch')):
+        info = execution.decide_trade('energy', 'strongly_bearish')
+    assert info == execution.price_trade('XLE', 'PUT')
+    assert info['strike'] == Decimal(round(UNDERLYING))
+
+
+def test_decide_trade_prices_live_without_fresh_template(fake_yf):
+    trade_templates.start(lambda t, o: None, ['XLE'], interval=60)
+    info = execution.decide_trade('energy', 'strongly_bullish')
+    assert info['ticker'] == 'XLE'
+    assert info['option_type'] == 'CALL'
+
+
+class NoPosts:
+    def get_new_posts(self):
+        return []
+
+
+@pytest.mark.django_db
+def test_run_bot_warms_templates(settings):
+    settings.INGESTION_CLASS = 'trading.tests.test_trade_templates.NoPosts'
+    settings.NLP_SERVICE_CLASS = 'trading.nlp_backends.LexiconNLPService'
+    out = StringIO()
+    with mock.patch.object(TemplateWarmer, 'refresh'):
+        call_command('run_bot', '--once', '--warm-templates', stdout=out)
+    tickers = [t for t in execution.SECTOR_TICKER.values() if t]
+    assert f"Warming trade templates for {2 * len(tickers)} contracts" in out.getvalue()
+    # --once stops the warmer on exit
+    assert trade_templates.lookup('XLE', 'CALL') is None
+    assert trade_templates._warmer is None
@@ -1,6 +1,8 @@
 import datetime
+import json
 from decimal import Decimal
 import pytest
+from unittest import mock
 from django.urls import reverse
 from django.test import Client
 from django.utils import timezone
@@ -27,4 +29,102 @@ def test_positions_list_view():
     assert 'Paper-Traded Option Positions' in content
     assert 'sample text for view' in content
     assert 'XLK' in content
-    assert '150' in content
\ No newline at end of file
+    assert '150' in content
+
+def make_trade(tweet_id, sector='energy', ticker='XLE', entry='10.00', exit=None):
+    post = Post.objects.create(
+        tweet_id=tweet_id, user_handle='usr', text=f'post {tweet_id}',
+        timestamp=timezone.now(), sector=sector, sentiment='strongly_bullish'
+    )
+    return OptionTrade.objects.create(
+        post=post, ticker=ticker, option_type='CALL', strike=Decimal('100'),
+        entry_price=Decimal(entry), exit_price=Decimal(exit) if exit else None,
+        expiry=timezone.now().date()
+    )
+
+
+@pytest.mark.django_db
+def test_positions_list_paginates_and_filters(settings):
+    settings.POSITIONS_PAGE_SIZE = 2
+    for i in range(3):
+        make_trade(f'e{i}')
+    make_trade('f0', sector='finance', ticker='XLF', exit='12.00')
+    client = Client()
+    page1 = client.get(reverse('positions_list'))
+    assert page1.context['page_obj'].paginator.num_pages == 2
+    assert len(page1.context['trades']) == 2
+    closed = client.get(reverse('positions_list'), {'status': 'closed'})
+    assert [t.post.tweet_id for t in closed.context['trades']] == ['f0']
+    assert closed.context['trades'][0].pl_pct == pytest.approx(20.0)
+    energy = client.get(reverse('positions_list'), {'sector': 'energy', 'page': 2})
+    assert [t.post.tweet_id for t in energy.context['trades']] == ['e0']
+    assert 'sector=energy&page=1' in energy.content.decode()
+
+
+@pytest.mark.django_db
+def test_pnl_summary_cached_and_invalidated(django_assert_num_queries, django_capture_on_commit_callbacks):
+    from trading.positions import pnl_summary
+    make_trade('s0', entry='10.00', exit='15.00')
+    summary = pnl_summary()
+    assert summary['closed'] == 1 and summary['realized'] == Decimal('5')
+    assert summary['avg_pl_pct'] == pytest.approx(50.0)
+    with django_assert_num_queries(0):
+        assert pnl_summary() == summary
+    # opening a trade (post_save) invalidates the cached summary, but only once it commits
+    with django_capture_on_commit_callbacks() as callbacks:
+        make_trade('s1')
+        assert pnl_summary() == summary
+    for callback in callbacks:
+        callback()
+    assert pnl_summary()['open'] == 1
+
+
+@pytest.mark.django_db
+def test_pnl_summary_invalidated_from_another_process(settings):
+    from django.core.cache.backends.filebased import FileBasedCache
+    from trading.positions import invalidate_pnl_summary, pnl_summary
+    assert pnl_summary()['total'] == 0
+    # a second cache client on the same LOCATION stands in for run_bot / close_positions
+    other = FileBasedCache(settings.CACHES['default']['LOCATION'], {})
+    with mock.patch('trading.positions.cache', other):
+        make_trade('p0')
+        invalidate_pnl_summary()
+    assert pnl_summary()['total'] == 1
+
+
+@pytest.mark.django_db
+def test_export_trades_ndjson_with_cursor():
+    trades = [make_trade(f'x{i}', entry='2.50') for i in range(3)]
+    client = Client()
+    response = client.get(reverse('export_rows', args=['trades', 'ndjson']), {'after': trades[0].id})
+    assert response.streaming
+    rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+    assert [r['id'] for r in rows] == [trades[1].id, trades[2].id]
+    assert rows[0]['post__tweet_id'] == 'x1'
+    assert rows[0]['entry_price'] == '2.50000000'
+
+
+@pytest.mark.django_db
+def test_export_posts_csv_time_range():
+    make_trade('old')
+    Post.objects.filter(tweet_id='old').update(timestamp=datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc))
+    make_trade('new')
+    client = Client()
+    response = client.get(reverse('export_rows', args=['posts', 'csv']), {'start': '2025-01-01', 'limit': '10'})
+    lines = b''.join(response.streaming_content).decode().splitlines()
+    assert lines[0] == 'id,tweet_id,user_handle,timestamp,sector,sentiment,text'
+    assert len(lines) == 2 and ',new,' in lines[1]
+    assert client.get(reverse('export_rows', args=['posts', 'csv']), {'start': 'soon'}).status_code == 400
+    assert client.get('/exports/wallets.csv').status_code == 404
+
+
+@pytest.mark.django_db
+def test_export_date_only_end_includes_that_day():
+    make_trade('noon')
+    make_trade('next')
+    utc = datetime.timezone.utc
+    Post.objects.filter(tweet_id='noon').update(timestamp=datetime.datetime(2025, 1, 31, 12, tzinfo=utc))
+    Post.objects.filter(tweet_id='next').update(timestamp=datetime.datetime(2025, 2, 1, tzinfo=utc))
+    response = Client().get(reverse('export_rows', args=['posts', 'ndjson']), {'end': '2025-01-31'})
+    rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+    assert [row['tweet_id'] for row in rows] == ['noon']
@@ -0,0 +1,17 @@
+"""
+Post text normalization shared by the classification cache, pre-filter and NLP backends.
+"""
+import re
+import unicodedata
+
+TOKEN_RE = re.compile(r"\$?[a-z][a-z0-9']+")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys: NFKC, collapsed whitespace, stripped."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text or "")).strip()
+
+
+def tokenize(text: str) -> set[str]:
+    """Distinct lower-cased word tokens (cashtags kept with their '$')."""
+    return set(TOKEN_RE.findall(normalize_text(text).lower()))
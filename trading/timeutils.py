@@ -0,0 +1,22 @@
+"""
+Date/time parsing shared by management commands and views.
+"""
+import datetime
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+
+def parse_utc(value: str, end: bool = False) -> datetime.datetime:
+    """
+    Aware datetime from an ISO date or datetime; dates and naive datetimes are taken as UTC.
+
+    A bare date is midnight, or with end=True the last instant of that day, so
+    it can close an inclusive (__lte) range without dropping the day itself.
+    """
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f"invalid date/time: {value}")
+    if end and parse_date(value) is not None:
+        parsed = datetime.datetime.combine(parsed.date(), datetime.time.max)
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed, datetime.timezone.utc)
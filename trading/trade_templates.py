@@ -0,0 +1,125 @@
+"""
+Pre-priced ATM trades for every sector ETF, kept fresh by a background thread.
+
+The warmer re-prices an ATM CALL and PUT per ticker every
+TRADE_TEMPLATE_REFRESH seconds, so when a strong signal arrives decide_trade
+copies a ready template instead of fetching the quote and option chain.
+Templates older than TRADE_TEMPLATE_MAX_AGE seconds (or priced on an earlier
+day, with a different expiry) are ignored and decide_trade prices live.
+"""
+import datetime
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from . import latency
+from .metrics import TEMPLATE_LOOKUPS
+
+log = logging.getLogger(__name__)
+
+OPTION_TYPES = ('CALL', 'PUT')
+
+
+class TemplateWarmer:
+    """Keeps price(ticker, option_type) results for each ticker and side, refreshed on a daemon thread."""
+
+    def __init__(self, price, tickers, interval: float | None = None, max_age: float | None = None):
+        self.price = price
+        self.targets = [(ticker, opt_type) for ticker in tickers for opt_type in OPTION_TYPES]
+        self.interval = interval if interval is not None else getattr(settings, 'TRADE_TEMPLATE_REFRESH', 5.0)
+        self.max_age = max_age if max_age is not None else getattr(settings, 'TRADE_TEMPLATE_MAX_AGE', 15.0)
+        # (ticker, option_type) -> (priced_at monotonic, priced_on date, info); entries are replaced, never mutated
+        self._templates = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._pool = None
+
+    def _price_one(self, target):
+        ticker, opt_type = target
+        try:
+            # background fetches would swamp the signal path's quote/chain latency histograms
+            with latency.muted():
+                info = self.price(ticker, opt_type)
+        except Exception as e:
+            # keep the previous template; it ages out if failures persist
+            log.warning("Could not price %s %s template: %s", ticker, opt_type, e)
+            return
+        if info:
+            self._templates[target] = (time.monotonic(), datetime.date.today(), info)
+
+    def refresh(self):
+        """Re-price every target once (tickers in parallel; CALL and PUT share the cached quote and chain)."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=max(1, len(self.targets)), thread_name_prefix='template')
+        with latency.span('template_refresh'):
+            list(self._pool.map(self._price_one, self.targets))
+
+    def get(self, ticker: str, opt_type: str) -> dict | None:
+        """A copy of the fresh template for (ticker, opt_type), or None if missing or stale."""
+        entry = self._templates.get((ticker, opt_type))
+        if entry is None:
+            TEMPLATE_LOOKUPS.inc(result='miss')
+            return None
+        priced_at, priced_on, info = entry
+        if time.monotonic() - priced_at > self.max_age or priced_on != datetime.date.today():
+            TEMPLATE_LOOKUPS.inc(result='stale')
+            return None
+        TEMPLATE_LOOKUPS.inc(result='hit')
+        return dict(info)
+
+    def _close_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                started = time.monotonic()
+                self.refresh()
+                self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+        finally:
+            self._close_pool()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='template-warmer', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float | None = None):
+        self._stop.set()
+        if self._thread is not None:
+            # the thread closes the pool once its current pass finishes
+            self._thread.join(timeout)
+            self._thread = None
+        else:
+            self._close_pool()
+
+
+_warmer: TemplateWarmer | None = None
+
+
+def start(price, tickers, **kwargs) -> TemplateWarmer:
+    """Start the process-wide warmer consulted by lookup() (replacing any running one)."""
+    global _warmer
+    stop()
+    _warmer = TemplateWarmer(price, tickers, **kwargs).start()
+    return _warmer
+
+
+def stop():
+    global _warmer
+    if _warmer is not None:
+        _warmer.stop()
+        _warmer = None
+
+
+def lookup(ticker: str, opt_type: str) -> dict | None:
+    """Fresh template from the running warmer, or None (no warmer, missing or stale)."""
+    if _warmer is None:
+        return None
+    return _warmer.get(ticker, opt_type)
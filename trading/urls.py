@@ -1,6 +1,10 @@
 from django.urls import path
-from .views import positions_list
+from .views import export_rows, metrics, positions_list
 
 urlpatterns = [
     path('positions/', positions_list, name='positions_list'),
+    # Streaming exports: /exports/trades.ndjson, /exports/posts.csv, ...
+    path('exports/<str:kind>.<str:fmt>', export_rows, name='export_rows'),
+    # Prometheus scrape target
+    path('metrics', metrics, name='metrics'),
 ]
\ No newline at end of file
@@ -1,10 +1,99 @@
+import csv
 
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import render
-from trading.models import OptionTrade
+from django.utils.http import urlencode
+
+from trading import metrics as bot_metrics
+from trading.models import OptionTrade, Post
+from trading.positions import PL_PCT, clean_filters, filter_trades, pnl_summary
+from trading.timeutils import parse_utc
+
+# Columns exported per model, and the timestamp that start/end filter on
+EXPORTS = {
+    'trades': (OptionTrade, 'entry_timestamp', [
+        'id', 'post_id', 'post__tweet_id', 'ticker', 'option_type', 'strike', 'expiry',
+        'entry_price', 'exit_price', 'entry_timestamp', 'exit_timestamp',
+    ]),
+    'posts': (Post, 'timestamp', [
+        'id', 'tweet_id', 'user_handle', 'timestamp', 'sector', 'sentiment', 'text',
+    ]),
+}
+CONTENT_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
 
 def positions_list(request):
-    """Render a table of paper-traded option positions and their causes."""
-    trades = OptionTrade.objects.select_related('post').all()
-    return render(request, 'positions.html', {'trades': trades})
+    """Render a page of paper-traded option positions, their causes and a P/L summary."""
+    filters = clean_filters(request.GET)
+    trades = (
+        filter_trades(filters)
+        .select_related('post')
+        .annotate(pl_pct=PL_PCT)
+        .order_by('-entry_timestamp', '-id')
+    )
+    paginator = Paginator(trades, getattr(settings, 'POSITIONS_PAGE_SIZE', 50))
+    page = paginator.get_page(request.GET.get('page'))
+    return render(request, 'positions.html', {
+        'trades': page,
+        'page_obj': page,
+        'summary': pnl_summary(filters),
+        'filters': filters,
+        'filter_query': urlencode(filters),
+    })
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for streaming csv.writer output."""
+    def write(self, value):
+        return value
+
+
+def export_rows(request, kind, fmt):
+    """
+    Stream every row of a model as NDJSON or CSV in constant memory.
+
+    Query params: start/end (ISO date or datetime, inclusive; a date-only end
+    covers that whole day) on the row's timestamp, after (cursor: only ids greater than this) and limit. Rows
+    come in id order, so the last id seen is the cursor for the next request.
+    """
+    if kind not in EXPORTS or fmt not in CONTENT_TYPES:
+        raise Http404(f"Unknown export {kind}.{fmt}")
+    model, time_field, fields = EXPORTS[kind]
+    rows = model.objects.order_by('id')
+    try:
+        if request.GET.get('start'):
+            rows = rows.filter(**{f'{time_field}__gte': parse_utc(request.GET['start'])})
+        if request.GET.get('end'):
+            rows = rows.filter(**{f'{time_field}__lte': parse_utc(request.GET['end'], end=True)})
+        if request.GET.get('after'):
+            rows = rows.filter(id__gt=int(request.GET['after']))
+        if request.GET.get('limit'):
+            rows = rows[:int(request.GET['limit'])]
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    chunk_size = getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+    values = rows.values_list(*fields).iterator(chunk_size=chunk_size)
+
+    if fmt == 'ndjson':
+        encoder = DjangoJSONEncoder()
+        stream = (encoder.encode(dict(zip(fields, row))) + '\n' for row in values)
+    else:
+        writer = csv.writer(_Echo())
+        def stream_csv():
+            yield writer.writerow(fields)
+            for row in values:
+                yield writer.writerow(row)
+        stream = stream_csv()
+    response = StreamingHttpResponse(stream, content_type=CONTENT_TYPES[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{kind}.{fmt}"'
+    return response
 
 # Create your views here.
+
+
+def metrics(request):
+    """Database-backed gauges in the Prometheus text format (pipeline metrics: run_bot --metrics-port)."""
+    return HttpResponse(bot_metrics.REGISTRY.render(bot_metrics.WEB_METRICS), content_type=bot_metrics.CONTENT_TYPE)